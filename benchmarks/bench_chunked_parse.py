@@ -0,0 +1,34 @@
+"""
+Serial against chunked parallel parsing of one large generated script.
+
+Usage: python benchmarks/bench_chunked_parse.py [n] [jobs ...]
+"""
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from rdfscript.parser import Parser  # noqa: E402
+from rdfscript.chunked import ChunkedParser  # noqa: E402
+from bench_parse_scaling import generate  # noqa: E402
+
+
+def timed(parser, script):
+    start = time.perf_counter()
+    forms = parser.parse(script)
+    return (forms, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    jobs = [int(j) for j in sys.argv[2:]] or [2, 4, 8]
+    script = generate(n)
+
+    (expected, serial) = timed(Parser(filename='bench.shb'), script)
+    print(f"{'serial':>8}: {serial:8.3f} s  ({os.cpu_count()} cpus)")
+    for j in jobs:
+        parser = ChunkedParser(filename='bench.shb', jobs=j, min_chunk_size=1 << 16)
+        (forms, elapsed) = timed(parser, script)
+        assert forms == expected
+        print(f"{j:>5} jobs: {elapsed:8.3f} s  speedup {serial / elapsed:5.2f}x")
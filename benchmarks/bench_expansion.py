@@ -0,0 +1,92 @@
+"""
+Cost of expanding instances of a layered template, and of a flat
+template with the same triples: time and language objects allocated
+per instance.
+
+Usage: python benchmarks/bench_expansion.py [n]
+"""
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from rdfscript.parser import Parser  # noqa: E402
+from rdfscript.env import Env  # noqa: E402
+from rdfscript.core import Node  # noqa: E402
+
+TEMPLATES = '''@prefix eg = <http://eg.org/>
+@prefix eg
+Base(x)
+(
+  eg.kind = x
+  eg.fixed = <http://eg.org/fixed>
+)
+Mid(x, y)
+(
+  Base(x)
+  eg.role = y
+  eg.label = "mid"
+)
+Part(x, y, z)
+(
+  Mid(x, y)
+  eg.size = z
+  eg.description = "generated"
+  eg.version = 1
+)
+FlatPart(x, y, z)
+(
+  eg.kind = x
+  eg.fixed = <http://eg.org/fixed>
+  eg.role = y
+  eg.label = "mid"
+  eg.size = z
+  eg.description = "generated"
+  eg.version = 1
+)
+'''
+
+
+def generate(n, template='Part'):
+    return '\n'.join(f'part_{i} is a {template}(kind_{i}, eg.role_{i % 7}, {i})'
+                     for i in range(n))
+
+
+class counting:
+    """Counts Node objects created while active."""
+
+    def __enter__(self):
+        self.count = 0
+        self._init = Node.__init__
+
+        def init(node, *args, **kwargs):
+            self.count += 1
+            self._init(node, *args, **kwargs)
+
+        Node.__init__ = init
+        return self
+
+    def __exit__(self, *exc):
+        Node.__init__ = self._init
+
+
+def bench(n, template='Part'):
+    env = Env()
+    env.interpret(Parser(filename='templates.shb').parse(TEMPLATES))
+    forms = Parser(filename='instances.shb').parse(generate(n, template))
+
+    with counting() as counter:
+        start = time.perf_counter()
+        env.interpret(forms)
+        elapsed = time.perf_counter() - start
+
+    return (elapsed, counter.count, len(env._rdf.triples))
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    for template in ['Part', 'FlatPart']:
+        (elapsed, nodes, triples) = bench(n, template)
+        print(f"{template:>8}: {n} instances, {triples} triples: {elapsed:.3f} s, "
+              f"{elapsed / n * 1e6:.1f} us and {nodes / n:.1f} nodes allocated per instance")
@@ -0,0 +1,62 @@
+"""
+Memory held by the parsed forms of a generated script, in bytes per
+form, and the number of distinct strings their names and URIs use.
+
+Usage: python benchmarks/bench_form_memory.py [n]
+"""
+import sys
+import os
+import gc
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from rdfscript.parser import Parser  # noqa: E402
+from rdfscript.core import Name, Uri  # noqa: E402
+from bench_parse_scaling import generate  # noqa: E402
+
+
+def strings(forms):
+    """Distinct and total name and URI strings reachable from forms."""
+    seen = set()
+    total = 0
+    stack = list(forms)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Name):
+            seen.add(id(node.name))
+            total += 1
+        elif isinstance(node, Uri):
+            seen.add(id(node.uri))
+            total += 1
+        elif isinstance(node, (list, tuple)):
+            stack.extend(node)
+        elif hasattr(type(node), '__slots__') or hasattr(node, '__dict__'):
+            for attr in getattr(node, '__dict__', {}):
+                stack.append(getattr(node, attr))
+            for cls in type(node).__mro__:
+                for attr in cls.__dict__.get('__slots__', ()):
+                    if hasattr(node, attr) and not attr.startswith('_'):
+                        stack.append(getattr(node, attr))
+    return (len(seen), total)
+
+
+def retained(script):
+    parser = Parser(filename='bench.shb')
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    forms = parser.parse(script)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (forms, after - before)
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    script = generate(n)
+    (forms, size) = retained(script)
+    (distinct, total) = strings(forms)
+    print(f"{len(forms)} forms: {size / len(forms):.0f} bytes per form, "
+          f"{total} names and URIs sharing {distinct} strings")
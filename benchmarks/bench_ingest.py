@@ -0,0 +1,55 @@
+"""
+Triples per second added to each RDFData store one at a time with add,
+as Env.add_triples did, against add_triples in batches of an
+expansion's triples and in a single batch.
+
+Usage: python benchmarks/bench_ingest.py [n] [batch]
+"""
+import sys
+import os
+import gc
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from rdfscript.rdf_data import stores  # noqa: E402
+from bench_store import generate  # noqa: E402
+
+
+def one_at_a_time(data, triples):
+    for (s, p, o) in triples:
+        data.add(s, p, o)
+
+
+def batched(size):
+    def add(data, triples):
+        for start in range(0, len(triples), size):
+            data.add_triples(triples[start:start + size])
+    return add
+
+
+def rate(store, add, triples):
+    data = stores[store](serializer='nt')
+    gc.collect()
+    start = time.perf_counter()
+    add(data, triples)
+    return len(triples) / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    triples = generate(n)
+    adds = [('add', one_at_a_time),
+            (f'batches of {batch}', batched(batch)),
+            ('one batch', batched(len(triples)))]
+    # the best of several runs, taking turns so that the machine
+    # slowing down affects every way of adding alike
+    best = {}
+    for _ in range(5):
+        for store in stores:
+            for (name, add) in adds:
+                key = (store, name)
+                best[key] = max(best.get(key, 0), rate(store, add, triples))
+    for ((store, name), value) in best.items():
+        print(f"{store:>8} {name:>14}: {value:9.0f} triples/s")
@@ -0,0 +1,40 @@
+"""
+Parse time against script length for generated instance declarations.
+
+Usage: python benchmarks/bench_parse_scaling.py [n ...]
+"""
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from rdfscript.parser import Parser  # noqa: E402
+
+
+def generate(n):
+    lines = ['use <sbol_2>']
+    for i in range(n):
+        lines.append(f'part_{i} is a Promoter(sequence_{i}, "atgc", 1, 2)\n'
+                     f'  (\n'
+                     f'  description = "generated part {i}"\n'
+                     f'  sbol_2.role = so.SO_0000167\n'
+                     f'  )')
+    return '\n'.join(lines)
+
+
+def bench(n):
+    script = generate(n)
+    parser = Parser(filename='bench.shb')
+    start = time.perf_counter()
+    forms = parser.parse(script)
+    elapsed = time.perf_counter() - start
+    assert len(forms) == n + 1
+    return elapsed
+
+
+if __name__ == '__main__':
+    sizes = [int(n) for n in sys.argv[1:]] or [1000, 10000, 100000]
+    for n in sizes:
+        elapsed = bench(n)
+        print(f"{n:>8} forms: {elapsed:8.3f} s  {elapsed / n * 1e6:8.2f} us/form")
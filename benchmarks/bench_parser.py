@@ -0,0 +1,43 @@
+"""
+Parser construction and library import benchmark.
+
+Usage: python benchmarks/bench_parser.py
+"""
+import sys
+import os
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+start = time.perf_counter()
+from rdfscript.parser import Parser, prebuilt  # noqa: E402
+prebuilt()
+cold = time.perf_counter() - start
+
+from rdfscript.env import Env  # noqa: E402
+from rdfscript.core import Uri  # noqa: E402
+
+
+def construct():
+    Parser(filename='bench.shb')
+
+
+def import_library(version):
+    env = Env(paths=['templates'])
+    env.bind_prefix('bench', Uri('http://bench.eg/'))
+    env.prefix = 'bench'
+    env.eval_import(Uri(version))
+
+
+if __name__ == '__main__':
+    print(f"cold start (import + tables): {cold * 1000:.2f} ms")
+
+    n = 1000
+    t = timeit.timeit(construct, number=n)
+    print(f"Parser() construction: {t / n * 1e6:.2f} us")
+
+    for version in ('sbol_2', 'sbol_3'):
+        n = 5
+        t = timeit.timeit(lambda: import_library(version), number=n)
+        print(f"use <{version}>: {t / n * 1000:.2f} ms")
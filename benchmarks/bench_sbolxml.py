@@ -0,0 +1,93 @@
+"""
+Time and peak memory of writing a generated SBOL2 design as SBOL
+RDF/XML through pysbolgraph, which copies the graph into an SBOL2Graph
+and builds the whole document as an lxml tree, against the native
+writer, for each store.
+
+Usage: python benchmarks/bench_sbolxml.py [n]
+
+pysbolgraph is no longer a dependency of shortbol; install it with
+pip install .[bench]
+"""
+import sys
+import os
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pysbolgraph.SBOL2Serialize import serialize_sboll2  # noqa: E402
+from pysbolgraph.SBOL2Graph import SBOL2Graph  # noqa: E402
+
+from rdfscript.core import Uri, Value  # noqa: E402
+from rdfscript.rdf_data import stores  # noqa: E402
+
+SBOL = 'http://sbols.org/v2#'
+RDF_TYPE = Uri('http://www.w3.org/1999/02/22-rdf-syntax-ns#type')
+
+
+def generate(n):
+    """
+    About n triples: ComponentDefinitions, each owning four
+    SequenceAnnotations that each own a Range.
+    """
+    def sbol(name):
+        return Uri(SBOL + name)
+
+    triples = []
+    for i in range(n // 50):
+        part = Uri(f'http://shortbol.org/v2#part_{i}/1')
+        triples += [(part, RDF_TYPE, sbol('ComponentDefinition')),
+                    (part, sbol('displayId'), Value(f'part_{i}')),
+                    (part, sbol('version'), Value('1'))]
+        for k in range(4):
+            annotation = Uri(f'http://shortbol.org/v2#part_{i}/annotation_{k}/1')
+            location = Uri(f'http://shortbol.org/v2#part_{i}/annotation_{k}/range/1')
+            triples += [(part, sbol('sequenceAnnotation'), annotation),
+                        (annotation, RDF_TYPE, sbol('SequenceAnnotation')),
+                        (annotation, sbol('displayId'), Value(f'annotation_{k}')),
+                        (annotation, sbol('location'), location),
+                        (location, RDF_TYPE, sbol('Range')),
+                        (location, sbol('start'), Value(k * 10 + 1)),
+                        (location, sbol('end'), Value(k * 10 + 10))]
+    return triples
+
+
+def pysbolgraph(data):
+    graph = SBOL2Graph()
+    graph += data._g
+    return serialize_sboll2(graph).decode('utf-8')
+
+
+def measure(function):
+    """
+    The time function takes, then its peak memory from a second run;
+    tracing slows it down. lxml allocates its tree outside Python, so
+    the peak pysbolgraph reaches is understated.
+    """
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    function()
+    size = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return (elapsed, size)
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    triples = generate(n)
+    with open(os.devnull, 'w') as devnull:
+        for store in stores:
+            data = stores[store](serializer='sbolxml', version='sbol_2')
+            data.bind_prefix('sbol', Uri(SBOL))
+            for (s, p, o) in triples:
+                data.add(s, p, o)
+            runs = [('native', lambda: data.write(devnull))]
+            if store == 'rdflib':
+                runs.insert(0, ('pysbolgraph', lambda: devnull.write(pysbolgraph(data))))
+            for (name, function) in runs:
+                (elapsed, size) = measure(function)
+                print(f"{store:>8} {name:>11}: {elapsed:7.2f} s, "
+                      f"peak {size / 2**20:7.1f} MiB for {len(triples)} triples")
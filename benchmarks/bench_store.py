@@ -0,0 +1,54 @@
+"""
+Time to add generated triples to each RDFData store and the memory the
+store holds afterwards, in bytes per triple.
+
+Usage: python benchmarks/bench_store.py [n]
+"""
+import sys
+import os
+import gc
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from rdfscript.core import Uri, Value  # noqa: E402
+from rdfscript.rdf_data import stores  # noqa: E402
+
+
+def generate(n):
+    """n triples over n / 8 subjects, as expanding parts gives."""
+    predicates = [Uri(f'http://sbols.org/v2#p{k}') for k in range(8)]
+    triples = []
+    for i in range(n // 8):
+        subject = Uri(f'http://shortbol.org/v2#part_{i}/1')
+        for (k, predicate) in enumerate(predicates):
+            if k % 2:
+                triples.append((subject, predicate, Value(f'value {i}')))
+            else:
+                triples.append((subject, predicate, Uri(f'http://sbols.org/v2#o{k}')))
+    return triples
+
+
+def bench(store, triples):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    data = stores[store](serializer='nt')
+    for (s, p, o) in triples:
+        data.add(s, p, o)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return (elapsed, size)
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    triples = generate(n)
+    for store in stores:
+        (elapsed, size) = bench(store, triples)
+        print(f"{store:>8}: {elapsed:7.3f} s to add {len(triples)} triples, "
+              f"{size / len(triples):6.0f} bytes per triple")
@@ -0,0 +1,50 @@
+"""
+Peak memory of parsing a generated script whole versus as a stream.
+
+Usage: python benchmarks/bench_stream_memory.py [n]
+"""
+import sys
+import os
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from rdfscript.parser import Parser  # noqa: E402
+from rdfscript.stream import FormStream  # noqa: E402
+from bench_parse_scaling import generate  # noqa: E402
+
+
+def whole(path):
+    with open(path) as infile:
+        forms = Parser(filename=path).parse(infile.read())
+    return len(forms)
+
+
+def streamed(path):
+    count = 0
+    for form in FormStream.from_path(path):
+        count += 1
+    return count
+
+
+def peak(function, path):
+    tracemalloc.start()
+    count = function(path)
+    (current, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, peak
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.NamedTemporaryFile('w', suffix='.shb', delete=False) as out:
+        out.write(generate(n))
+    try:
+        size = os.path.getsize(out.name)
+        print(f"{n} forms, {size / 1e6:.1f} MB of script")
+        for function in (whole, streamed):
+            (count, bytes_peak) = peak(function, out.name)
+            print(f"{function.__name__:>9}: {count} forms, peak {bytes_peak / 1e6:8.1f} MB")
+    finally:
+        os.remove(out.name)
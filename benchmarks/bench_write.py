@@ -0,0 +1,37 @@
+"""
+Peak memory of serialising generated triples whole, as str(env) does,
+against writing them as they are serialised, for each store.
+
+Usage: python benchmarks/bench_write.py [n]
+"""
+import sys
+import os
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from rdfscript.rdf_data import stores  # noqa: E402
+from bench_store import generate  # noqa: E402
+
+
+def peak(function):
+    tracemalloc.start()
+    function()
+    size = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    triples = generate(n)
+    with open(os.devnull, 'w') as devnull:
+        for store in stores:
+            for serializer in ('nt', 'turtle'):
+                data = stores[store](serializer=serializer)
+                for (s, p, o) in triples:
+                    data.add(s, p, o)
+                whole = peak(lambda: devnull.write(data.serialise()))
+                streamed = peak(lambda: data.write(devnull))
+                print(f"{store:>8} {serializer:>6}: whole {whole / 2**20:7.1f} MiB, "
+                      f"streamed {streamed / 2**20:7.1f} MiB")
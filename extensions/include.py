@@ -12,7 +12,7 @@ This enables a user to reference said templates without having to prefix with sa
 '''
 class Include:
     def __init__(self,namespace):
-        self.namespace = namespace.split()[-1]
+        self.namespace = namespace.local_name
         self.import_pragma = ImportPragma(Identifier(Uri(self.namespace)))
 
 
@@ -22,14 +22,14 @@ class Include:
         
         for k in env._template_table.keys():
             if env.uri_for_prefix(self.namespace).uri in k.uri:
-                name = Identifier(user_prefix,Uri(k.split()[-1]))
+                name = Identifier(user_prefix,Uri(k.local_name))
                 assignment = Assignment(name,k)
                 assignment.evaluate(env)
         
         to_evaulate = []
         for k,v in env._symbol_table.items():
             #if env.uri_for_prefix(self.namespace).uri in v.uri:
-            name = Identifier(user_prefix,Uri(k.split()[-1]))
+            name = Identifier(user_prefix,Uri(k.local_name))
             assignment = Assignment(name,v)
             to_evaulate.append(Assignment(name,v))
         for assignment in to_evaulate:
@@ -48,7 +48,7 @@ class SBOLCompliant:
         parent = get_SBOL_parent(triplepack, self.subject)
         # Everything has a display id
         if not triplepack.search((self.subject, identifiers.predicates.display_id, None)):
-            new_displayId = self.subject.split()[-1]
+            new_displayId = self.subject.local_name
         
             triplepack.add((self.subject, identifiers.predicates.display_id, Value(new_displayId)))
         # Everything has a Version
@@ -145,7 +145,7 @@ def is_SBOL_Compliant(triplepack, uri):
     compliant = dId is not None and pId is not None
     compliant = compliant and uri.uri == pId.uri + "/" + str(version.value)
     if is_SBOL_TopLevel(triplepack, uri):
-        compliant = compliant and pId.split()[-1] == dId.value
+        compliant = compliant and pId.local_name == dId.value
     return compliant
 
 
@@ -1,3 +1,216 @@
+import itertools
+
+
+def triple_delta(before, after):
+    """
+    What an extension changed in the triples it was given: the triples
+    of the set before that are not in after, and those of after, in
+    order and once each, that are not in before.
+    """
+    kept = set(after)
+    removed = [triple for triple in before if triple not in kept]
+    added = []
+    seen = set()
+    for triple in after:
+        if triple not in before and triple not in seen:
+            seen.add(triple)
+            added.append(triple)
+    return (removed, added)
+
+
+class TripleList(list):
+    """
+    A list of triples that indexes them by subject and by object for
+    TriplePack.search. append, remove and substitute keep the indexes up
+    to date; any other change drops them, to be built again on the next
+    search. Each index keeps the triples in the order of the list.
+    """
+
+    def __init__(self, triples=()):
+        super().__init__(triples)
+        self._index = None
+        self._positions = None
+
+    def index_terms(self):
+        """
+        The (subjects, objects) indexes, mapping each term to the
+        triples it is the subject or object of, or False if some term
+        cannot be hashed, such as an Identifier.
+        """
+        if self._index is None:
+            subjects = {}
+            objects = {}
+            try:
+                for triple in self:
+                    subjects.setdefault(triple[0], []).append(triple)
+                    objects.setdefault(triple[2], []).append(triple)
+                self._index = (subjects, objects)
+            except TypeError:
+                self._index = False
+        return self._index
+
+    def positions(self):
+        """
+        Where each triple is in the list, by its id, or None if the
+        list holds the same triple object more than once.
+        """
+        if self._positions is None:
+            positions = dict(zip(map(id, self), itertools.count()))
+            if len(positions) != len(self):
+                return None
+            self._positions = positions
+        return self._positions
+
+    def candidates(self, subject, object):
+        """
+        The triples that can match a search for subject and object, in
+        order: those with that subject or that object if either is
+        given, or all of them.
+        """
+        if not subject and not object:
+            return self
+
+        index = self.index_terms()
+        if not index:
+            return self
+
+        try:
+            if subject:
+                return index[0].get(subject, ())
+            return index[1].get(object, ())
+        except TypeError:
+            return self
+
+    def append(self, triple):
+        super().append(triple)
+        if self._positions is not None:
+            if id(triple) in self._positions:
+                self._positions = None
+            else:
+                self._positions[id(triple)] = len(self) - 1
+        if self._index:
+            try:
+                self._index[0].setdefault(triple[0], []).append(triple)
+                self._index[1].setdefault(triple[2], []).append(triple)
+            except TypeError:
+                self._index = False
+
+    def remove(self, triple):
+        index = self._index
+        if not index:
+            self._positions = None
+            super().remove(triple)
+            return
+
+        try:
+            entries = index[0].get(triple[0], ())
+        except TypeError:
+            self._index = None
+            self._positions = None
+            super().remove(triple)
+            return
+
+        # the first equal triple in the list is the first in its index
+        for found in entries:
+            if found == triple:
+                break
+        else:
+            raise ValueError("TripleList.remove(x): x not in list")
+
+        positions = self._positions
+        if positions is None:
+            position = list(map(id, self)).index(id(found))
+        else:
+            position = positions.pop(id(found))
+        super().__delitem__(position)
+        if positions is not None:
+            # the triples after it each move up one
+            positions.update(zip(map(id, self[position:]), itertools.count(position)))
+        remove_identical(index[0][found[0]], found)
+        remove_identical(index[1][found[2]], found)
+
+    def substitute(self, old, new, predicate=None):
+        """
+        Put new in place of old as the subject, and as the object except
+        of triples with predicate, of every triple, where each triple is
+        in the list. Only the triples with old as their subject or
+        object are visited. Returns False, changing nothing, if the
+        triples are not indexed.
+        """
+        index = self.index_terms()
+        if not index:
+            return False
+
+        try:
+            affected = index[0].get(old, []) + index[1].get(old, [])
+        except TypeError:
+            return False
+
+        changes = {}
+        for triple in affected:
+            (s, p, o) = triple
+            replaced = (new if s == old else s,
+                        p,
+                        new if o == old and p != predicate else o)
+            if replaced != triple:
+                changes[id(triple)] = (triple, replaced)
+        if not changes:
+            return True
+
+        positions = self.positions()
+        if positions is None:
+            return False
+
+        # replace the changed triples in the index entries they stay in
+        # and move them to those they join, noting the entries joined
+        joined = {}
+        for (table, position) in zip(index, (0, 2)):
+            for (triple, replaced) in changes.values():
+                entries = table[triple[position]]
+                at = list(map(id, entries)).index(id(triple))
+                if replaced[position] == triple[position]:
+                    entries[at] = replaced
+                else:
+                    del entries[at]
+                    entries = table.setdefault(replaced[position], [])
+                    entries.append(replaced)
+                    joined[id(entries)] = entries
+
+        for (triple, replaced) in changes.values():
+            position = positions.pop(id(triple))
+            super().__setitem__(position, replaced)
+            positions[id(replaced)] = position
+        for entries in joined.values():
+            entries.sort(key=lambda triple: positions[id(triple)])
+        return True
+
+    def changed(method):
+        def drop_index(self, *args, **kwargs):
+            self._index = None
+            self._positions = None
+            return method(self, *args, **kwargs)
+        return drop_index
+
+    extend = changed(list.extend)
+    insert = changed(list.insert)
+    pop = changed(list.pop)
+    clear = changed(list.clear)
+    sort = changed(list.sort)
+    reverse = changed(list.reverse)
+    __setitem__ = changed(list.__setitem__)
+    __delitem__ = changed(list.__delitem__)
+    __iadd__ = changed(list.__iadd__)
+    __imul__ = changed(list.__imul__)
+    del changed
+
+
+def remove_identical(entries, triple):
+    for (position, item) in enumerate(entries):
+        if item is triple:
+            del entries[position]
+            return
+
+
 class TriplePack:
     """
     The object passed to an extensions' run() method.
@@ -13,7 +226,7 @@ class TriplePack:
     """
 
     def __init__(self, triples, bindings, templates, paths):
-        self._triples = triples
+        self._triples = TripleList(triples)
         self._bindings = bindings
         self._templates = templates
         self._paths = paths
@@ -51,7 +264,7 @@ class TriplePack:
                     (y == p or not p) and
                     (z == o or not o))
         
-        return [t for t in self.triples if matcher(t)]
+        return [t for t in self.triples.candidates(s, o) if matcher(t)]
 
     def has(self, *args):
         owner = None
@@ -130,13 +343,16 @@ class TriplePack:
         def sub(triple):
             return tuple(map(lambda x: new if x == old else x, triple))
 
-        self._triples = list(map(sub, self.triples))
+        self._triples = TripleList(map(sub, self.triples))
 
 
     def replace_with_type(self, old, new, type):
         '''
         Replaces all instances of URI in list apart from when predicate is of a certain type.
         '''
+        if self._triples.substitute(old, new, type):
+            return
+
         new_triples = []
         for (s,p,o) in self.triples:
             new_s = s
@@ -152,7 +368,7 @@ class TriplePack:
                 
             new_triples.append((new_s,new_p,new_o))
         
-        self._triples = new_triples
+        self._triples = TripleList(new_triples)
 
 
     def sub_pack(self, owner):
@@ -0,0 +1,121 @@
+import hashlib
+import os
+import pathlib
+import pickle
+import shutil
+import tempfile
+
+from .parser import cache_root
+
+
+def code_version():
+    """Digest of the interpreter sources, which decide what a script parses and evaluates to."""
+    digest = hashlib.sha1()
+    package = pathlib.Path(__file__).parent
+    for source in sorted(package.glob('*.py')):
+        digest.update(source.name.encode('utf-8'))
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+class FormCache:
+    """
+    Content-addressed on-disk cache of parsed form lists.
+
+    Entries are keyed by the interpreter sources, the filename recorded in
+    the forms' Locations and the text of the script, so an edited file
+    or a changed grammar simply misses. A hit returns freshly
+    unpickled forms, which evaluation is free to mutate. Stale entries
+    are never removed, so it is meant for files that rarely change,
+    such as libraries, rather than a script being edited.
+    """
+
+    def __init__(self, directory=None, enabled=True):
+        if directory is None:
+            directory = cache_root() / 'forms'
+        self._dir = directory
+        self.enabled = enabled
+
+        self._code_version = None
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+
+    @property
+    def directory(self):
+        return self._dir
+
+    @property
+    def stats(self):
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'stores': self.stores,
+                'errors': self.errors}
+
+    def __repr__(self):
+        return (f"[FormCache: {self._dir} hits={self.hits} "
+                f"misses={self.misses} stores={self.stores} "
+                f"errors={self.errors}]")
+
+    def key(self, filename, text):
+        if self._code_version is None:
+            self._code_version = code_version()
+
+        digest = hashlib.sha256()
+        for part in (self._code_version, str(filename), text):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self._dir, key[:2], key + '.pickle')
+
+    def load(self, filename, text):
+        if not self.enabled:
+            return None
+
+        path = self.path(self.key(filename, text))
+        try:
+            with open(path, 'rb') as infile:
+                forms = pickle.load(infile)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # truncated or stale entry, drop it and reparse
+            self.errors += 1
+            self.misses += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+        self.hits += 1
+        return forms
+
+    def store(self, filename, text, forms):
+        if not self.enabled:
+            return False
+
+        path = self.path(self.key(filename, text))
+        tmp = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            (fd, tmp) = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as outfile:
+                pickle.dump(forms, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except (OSError, pickle.PicklingError, RecursionError):
+            self.errors += 1
+            if tmp is not None and os.path.exists(tmp):
+                os.remove(tmp)
+            return False
+
+        self.stores += 1
+        return True
+
+    def purge(self):
+        shutil.rmtree(self._dir, ignore_errors=True)
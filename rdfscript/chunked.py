@@ -0,0 +1,196 @@
+import concurrent.futures
+import gc
+import os
+import pickle
+
+from .parser import Parser
+from .source import SourceMap
+from .stream import FORM_START, CONTINUATION, stream_lexer
+
+
+def open_ended(script, end):
+    """
+    Whether a token might run on past end, the start of a line: after
+    an unclosed < (a URI) or after is (the start of is a).
+    """
+    if script.rfind('<', 0, end) > script.rfind('>', 0, end):
+        return True
+
+    while end > 0 and script[end - 1].isspace():
+        end -= 1
+    return script.endswith('is', 0, end)
+
+
+# the SourceMaps of scripts being unpickled by parse_chunks, by key
+_sources = {}
+
+
+def _whole_source(key):
+    return _sources[key]
+
+
+class _ChunkSource(SourceMap):
+    """
+    The SourceMap of a chunk in a worker. It unpickles as the SourceMap
+    of the whole script registered under key, so the forms of every
+    chunk share it without being walked to rebind their Locations.
+    """
+
+    __slots__ = ('key',)
+
+    def __init__(self, filename, key):
+        super().__init__(filename)
+        self.key = key
+
+    def __reduce__(self):
+        return (_whole_source, (self.key,))
+
+
+def parse_chunk(filename, key, text, offset, lineno):
+    """
+    Parse text, the part of a script starting at offset, in a worker
+    process. Returns the types of its first and last tokens, whether its
+    brackets balance without closing any opened before it, and its
+    forms pickled to refer to the SourceMap registered under key, or
+    None if they did not parse.
+    """
+    # as in Parser._parse, the collector would only be walking the
+    # tokens and acyclic nodes allocated here
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        return _parse_chunk(filename, key, text, offset, lineno)
+    finally:
+        if collecting:
+            gc.enable()
+
+
+def _parse_chunk(filename, key, text, offset, lineno):
+    lexer = stream_lexer(filename)
+    lexer.lineno = lineno
+    lexer.input(text)
+
+    tokens = list(iter(lexer.token, None))
+    if not tokens:
+        return (None, None, True, pickle.dumps([]))
+
+    depth = 0
+    balanced = True
+    for token in tokens:
+        token.lexpos += offset
+        if token.type == '(':
+            depth += 1
+        elif token.type == ')':
+            depth -= 1
+            balanced = balanced and depth >= 0
+    balanced = balanced and depth == 0
+
+    payload = None
+    if balanced:
+        source = _ChunkSource(filename, key)
+        try:
+            forms = Parser(filename=filename).parse_tokens(tokens, source)
+        except Exception:
+            # left for the serial parse to report in context
+            forms = None
+
+        if forms is not None:
+            payload = pickle.dumps(forms, protocol=pickle.HIGHEST_PROTOCOL)
+
+    return (tokens[0].type, tokens[-1].type, balanced, payload)
+
+
+class ChunkedParser(Parser):
+    """
+    A Parser that splits a large script into chunks at top-level form
+    boundaries and parses them concurrently in worker processes.
+
+    Chunks are cut at the start of a line that begins with a character
+    outside whitespace and brackets. Whether a cut really falls between
+    two forms is only known once the chunks are lexed, so the workers
+    report it and any script that was not cut cleanly, or that has a
+    syntax error, is parsed serially instead. The forms are the same as
+    Parser.parse produces, with Locations relative to the whole script.
+    """
+
+    def __init__(self, debug_lvl=0, filename=None, cache=None,
+                 jobs=None, min_chunk_size=1 << 18):
+        super().__init__(debug_lvl=debug_lvl, filename=filename, cache=cache)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.min_chunk_size = min_chunk_size
+
+    def parse(self, script):
+        if self.cache is not None:
+            forms = self.cache.load(self.filename, script)
+            if forms is not None:
+                return forms
+
+        source = SourceMap(self.filename, script)
+        forms = self.parse_chunks(script, source)
+        if forms is None:
+            self.use_source(source)
+            forms = self._parse(script, self.scanner)
+
+        if self.cache is not None:
+            self.cache.store(self.filename, script, forms)
+        return forms
+
+    def cuts(self, script):
+        """Offsets at which to try splitting script, in order."""
+        count = min(self.jobs, len(script) // self.min_chunk_size)
+        cuts = []
+        for k in range(1, count):
+            position = script.find('\n', k * len(script) // count)
+            while position != -1:
+                start = position + 1
+                if (start < len(script) and
+                        not script[start].isspace() and
+                        script[start] not in '()' and
+                        not open_ended(script, start)):
+                    break
+                position = script.find('\n', start)
+
+            if position == -1:
+                break
+            if not cuts or start > cuts[-1]:
+                cuts.append(start)
+        return cuts
+
+    def parse_chunks(self, script, source):
+        """The forms of script parsed in chunks, or None if it cannot be."""
+        cuts = self.cuts(script)
+        if not cuts:
+            return None
+
+        key = f'{os.getpid()}:{id(source)}'
+        starts = [0] + cuts
+        ends = cuts + [len(script)]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            results = list(pool.map(parse_chunk,
+                                    [self.filename] * len(starts),
+                                    [key] * len(starts),
+                                    [script[s:e] for (s, e) in zip(starts, ends)],
+                                    starts,
+                                    [source.line(s) for s in starts]))
+
+        previous = None
+        for (first, last, balanced, payload) in results:
+            if not balanced or payload is None:
+                return None
+            if first is not None and previous is not None:
+                if previous in CONTINUATION or first not in FORM_START:
+                    return None
+            previous = last if last is not None else previous
+
+        forms = []
+        collecting = gc.isenabled()
+        gc.disable()
+        _sources[key] = source
+        try:
+            for (_, _, _, payload) in results:
+                forms.extend(pickle.loads(payload))
+        finally:
+            del _sources[key]
+            if collecting:
+                gc.enable()
+        return forms
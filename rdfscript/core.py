@@ -1,38 +1,53 @@
 import rdflib
 import re
+import weakref
 
 from .error import PrefixError
 from .error import UnexpectedType
+from .source import Location
 
 
 class Node:
     """Language object."""
 
+    __slots__ = ('_source', '_offset')
+
     def __init__(self, location):
         """
         location is a Location object representing this language
-        object's position in the source code.
+        object's position in the source code. Only its SourceMap and
+        offset are kept; the Location is rebuilt when asked for.
         """
-        self._location = location
+        if location is None:
+            self._source = None
+            self._offset = None
+        else:
+            self._source = location.source
+            self._offset = location.offset
 
     @property
     def location(self):
-        return self._location
+        if self._source is None:
+            return None
+        return Location(self._source, self._offset)
 
     @property
     def line(self):
-        return self._location.line
+        return self._source.line(self._offset)
 
     @property
     def col(self):
-        return self._location.col
+        return self._source.absolute(self._offset)
 
     @property
     def file(self):
-        return self._location.filename
+        return self._source.filename
 
 
 class Identifier(Node):
+
+    __slots__ = ('parts',)
+
     def __init__(self, *parts, location=None):
         super().__init__(location)
         self.parts = list(parts)
@@ -76,10 +91,42 @@ class Identifier(Node):
         return Identifier(*flat_list,location=self.location)
 
 
+    def resolution_key(self, context):
+        """
+        The key under which the value of this identifier is cached in
+        context, or None if it has parts whose value is not a Uri.
+        """
+        key = [context.prefix]
+        for part in self.parts:
+            if isinstance(part, Uri):
+                key.append(part._term)
+            elif type(part) is Name:
+                key.append(part.name)
+            else:
+                return None
+        return tuple(key)
+
     def evaluate(self, context):
+        key = self.resolution_key(context)
+        if key is not None:
+            cached = context.cached_resolution(key)
+            if cached is not None:
+                (head, value) = cached
+                if head is not None and not isinstance(self.parts[0], Uri):
+                    (inserted, uri) = head
+                    if inserted:
+                        self.parts.insert(0, uri)
+                    else:
+                        self.parts[0] = uri
+                return value
+
+        head = None
         if not isinstance(self.parts[0], (Uri, Parameter)):
+            length = len(self.parts)
             self.prefixify(context)
+            head = (len(self.parts) > length, self.parts[0])
 
+        lookups = []
         uri = Uri('')
         for i, part in enumerate(self.parts):
             try:
@@ -92,6 +139,7 @@ class Identifier(Node):
                 uri = uri + part.evaluate(context)
                 
                 binding = context.lookup(uri)
+                lookups.append(uri)
                 if binding is not None and i == len(self) - 1 :
                     uri = binding
                 elif isinstance(binding, Uri):
@@ -101,10 +149,15 @@ class Identifier(Node):
                 new_parts = self.parts if uri == Uri('') else [uri, *self.parts[i:]]
                 return Identifier(*new_parts, location=self.location)
 
+        if key is not None:
+            context.cache_resolution(key, head, uri, lookups)
         return uri
 
 
 class Name(Node):
+
+    __slots__ = ('name',)
+
     def __init__(self, name_string, location=None):
         super().__init__(location=location)
         self.name = name_string
@@ -124,6 +177,8 @@ class Name(Node):
 
 class Parameter(Name):
 
+    __slots__ = ('position',)
+
     def __init__(self, name_string, position, location=None):
         super().__init__(name_string, location=location)
         self.position = position
@@ -155,6 +210,8 @@ class Parameter(Name):
 
 class Self(Parameter):
 
+    __slots__ = ()
+
     def __init__(self, location=None):
         super().__init__('self', -1, location=location)
 
@@ -168,28 +225,95 @@ class Self(Parameter):
         return self
 
 
+class UriTerm:
+    """
+    The string of a URI, shared by every Uri equal to it.
+
+    Terms are interned by intern_uri, so equal URIs have the same term
+    and compare by identity. A term computes its hash once, and its
+    split parts and rdflib URIRef when first asked for. Terms are only
+    weakly held by the intern table, so a term is freed with the last
+    Uri that uses it.
+    """
+
+    __slots__ = ('uri', 'hash', '_parts', '_rdf', '__weakref__')
+
+    def __init__(self, uri):
+        self.uri = uri
+        self.hash = hash(uri)
+        self._parts = None
+        self._rdf = None
+
+    def __reduce__(self):
+        return (intern_uri, (self.uri,))
+
+    @property
+    def parts(self):
+        if self._parts is None:
+            self._parts = tuple(re.split('#|\\/|:', self.uri))
+        return self._parts
+
+    @property
+    def rdf(self):
+        if self._rdf is None:
+            self._rdf = rdflib.URIRef(self.uri)
+        return self._rdf
+
+
+# every UriTerm in use, by its string
+_terms = weakref.WeakValueDictionary()
+
+
+def intern_uri(uri):
+    """The UriTerm for the string uri."""
+    term = _terms.get(uri)
+    if term is None:
+        term = _terms[uri] = UriTerm(uri)
+    return term
+
+
+def join_uris(left, right):
+    """The UriTerm for the concatenation of two UriTerms."""
+    return intern_uri(left.uri + right.uri)
+
+
 class Uri(Node):
     """Language object for a URI."""
 
+    __slots__ = ('_term',)
+
     def __init__(self, uri, location=None):
         """
         uri can be one of:
           - string
           - rdflib.URIRef object
           - Uri object
+          - UriTerm object
 
-        uri is converted to a string
+        uri is converted to its interned UriTerm
         """
         super().__init__(location)
-        if isinstance(uri, rdflib.URIRef):
-            self.uri = uri.toPython()
+        if isinstance(uri, UriTerm):
+            self._term = uri
         elif isinstance(uri, Uri):
-            self.uri = uri.uri
+            self._term = uri._term
+        elif isinstance(uri, rdflib.URIRef):
+            self._term = intern_uri(uri.toPython())
+            if self._term._rdf is None:
+                self._term._rdf = uri
         else:
-            self.uri = uri
+            self._term = intern_uri(uri)
+
+    @property
+    def uri(self):
+        return self._term.uri
+
+    @uri.setter
+    def uri(self, uri):
+        self._term = intern_uri(uri)
 
     def __eq__(self, other):
-        return isinstance(other, Uri) and self.uri == other.uri
+        return isinstance(other, Uri) and self._term is other._term
 
     def __str__(self):
         return f"<{self.uri}>"
@@ -198,31 +322,37 @@ class Uri(Node):
         return f"[URI: {self.uri}]"
 
     def __hash__(self):
-        return self.uri.__hash__()
+        return self._term.hash
 
     def __add__(self, other):
         if not isinstance(other, Uri):
             raise TypeError(f"Parameter mismatch at {self.uri} with parameter name: {other}")
 
-        return Uri(self.uri + other.uri)
+        return Uri(join_uris(self._term, other._term))
 
     def extend(self, other, delimiter='#'):
         self.uri = self.uri + delimiter + other.uri
 
     def split(self):
-        splited = re.split('#|\/|:', self.uri)
-        return splited
+        return list(self._term.parts)
+
+    @property
+    def local_name(self):
+        """The last part of the URI after a #, / or :."""
+        return self._term.parts[-1]
 
     def evaluate(self, context):
         return self
     
     def to_rdflib(self):
-        return rdflib.URIRef(self.uri)
+        return self._term.rdf
 
 
 class Value(Node):
     """Language object for an RDF literal."""
 
+    __slots__ = ('value',)
+
     def __init__(self, python_literal, location=None):
 
         Node.__init__(self, location)
@@ -248,6 +378,8 @@ class Value(Node):
 
 class Argument(Value):
 
+    __slots__ = ('position',)
+
     def __init__(self, value_expr, position, location=None):
         super().__init__(location)
         self.value = value_expr
@@ -287,6 +419,8 @@ class Argument(Value):
 
 class Assignment(Node):
 
+    __slots__ = ('name', 'value')
+
     def __init__(self, name, value, location=None):
         super().__init__(location)
         self.name = name
@@ -1,3 +1,4 @@
+import contextlib
 import pathlib
 import logging
 
@@ -14,8 +15,9 @@ from .importer import Importer
 
 from .extensions import ExtensionManager
 from extensions.error import ExtensionError
-from extensions.triples import TriplePack
-from .rdf_data import RDFData
+from extensions.triples import TriplePack, triple_delta
+from .rdf_data import MemoryData, stores
+from .plan import SubstitutionPlan
 
 
 class Env(object):
@@ -25,18 +27,45 @@ class Env(object):
                  serializer=None,
                  paths=[],
                  extensions=[],
-                 version = None):
+                 version = None,
+                 form_cache=None,
+                 snapshots=None,
+                 prefetcher=None,
+                 check=False,
+                 evaluator=None,
+                 profiler=None,
+                 store='rdflib'):
 
         self._symbol_table = {}
         self._template_table = {}
+        self._template_plans = {}
+        self._template_definitions = {}
+        self._template_dependents = {}
+        self._reflattening = set()
+        self._expanded = None
+        self._reads = None
         self._extension_table = {}
         self._extension_manager = ExtensionManager(extras=extensions)
-
-        self._rdf = RDFData(serializer=serializer)
-        self.uri = Uri(self._rdf._g.identifier.toPython())
+        self._generation = 0
+        self._resolutions = {}
+        self._resolution_dependents = {}
+        self.term_stats = {'terms': 0, 'evaluated': 0}
+
+        self.check = check
+        self.store = store
+        if check:
+            self._rdf = MemoryData()
+        else:
+            self._rdf = stores[store](serializer=serializer, version=version)
+        self.uri = self._rdf.namespace
         self.prefix = None
         self.version = version
 
+        self._form_cache = form_cache
+        self._snapshots = snapshots
+        self._prefetcher = prefetcher
+        self._evaluator = evaluator
+        self.profiler = profiler
         self._paths = paths
         if filename:
             paths.append(pathlib.Path(filename).parent)
@@ -47,12 +76,17 @@ class Env(object):
     def __repr__(self):
         return f"{self._rdf.serialise()}"
 
+    def write(self, outfile, sort=False):
+        """Write the graph serialised to the text file outfile."""
+        self._rdf.write(outfile, sort=sort)
+
     @property
     def prefix(self):
         return self._prefix
 
     @prefix.setter
     def prefix(self, prefix):
+        self.invalidate_resolutions()
         if prefix is not None:
             ns = self._rdf.uri_for_prefix(prefix)
 
@@ -63,7 +97,7 @@ class Env(object):
                 self._uri = ns
         else:
             self._prefix = prefix
-            self._uri = Uri(self._rdf._g.identifier.toPython())
+            self._uri = self._rdf.namespace
 
         return prefix
 
@@ -81,28 +115,137 @@ class Env(object):
             raise PrefixError(uri, None)
 
     def add_triples(self, triples):
-        """Add a triple of Uri or Value language objects to the RDF graph."""
-        for (s, p, o) in triples:
-            self._rdf.add(s, p, o)
+        """Add triples of Uri or Value language objects to the RDF graph."""
+        self._rdf.add_triples(triples)
 
     def bind_prefix(self, prefix, uri):
         self._rdf.bind_prefix(prefix, uri)
+        self.invalidate_resolutions()
         return prefix
 
     def assign(self, uri, value):
         self._symbol_table[uri] = value
+        for key in self._resolution_dependents.pop(uri, ()):
+            self._resolutions.pop(key, None)
+
+    def invalidate_resolutions(self):
+        """
+        Forget every cached identifier resolution, after a change to
+        the prefixes or to the symbol table as a whole.
+        """
+        self._generation += 1
+        self._resolutions = {}
+        self._resolution_dependents = {}
+
+    def cached_resolution(self, key):
+        """
+        The (head, value) that Identifier.evaluate cached for key in
+        this generation, or None.
+        """
+        entry = self._resolutions.get(key)
+        if entry is None or entry[0] != self._generation:
+            return None
+        if self._reads is not None:
+            self._reads.update(entry[3])
+        return entry[1:3]
+
+    def cache_resolution(self, key, head, value, lookups):
+        """
+        Cache what an identifier with key resolved to: head, how
+        prefixify changed its first part, and value. lookups are the
+        symbol table entries it read; assigning any of them evicts it.
+        """
+        self._resolutions[key] = (self._generation, head, value, tuple(lookups))
+        for uri in lookups:
+            self._resolution_dependents.setdefault(uri, []).append(key)
 
     def lookup(self, uri):
+        if self._reads is not None:
+            self._reads.add(uri)
         return self._symbol_table.get(uri, None)
 
-    def assign_template(self, uri, template):
+    def assign_template(self, uri, template, bases=(), definition=None):
+        """
+        Store the flattened triples of template uri. bases are the
+        templates it was flattened from and definition the Template
+        and prefix it was evaluated with, used to flatten it again if
+        any of its bases is redefined.
+        """
+        previous = self._template_table.get(uri)
         self._template_table[uri] = template
+        self._template_plans[uri] = SubstitutionPlan(template)
+        if definition is not None:
+            self._template_definitions[uri] = definition
+        for base in bases:
+            if base != uri:
+                self._template_dependents.setdefault(base, set()).add(uri)
+
+        if previous is not None and previous != template:
+            self.reflatten_dependents(uri)
+
+    def reflatten_dependents(self, uri):
+        """Flatten the templates derived from template uri again."""
+        for dependent in sorted(self._template_dependents.get(uri, ()), key=str):
+            definition = self._template_definitions.get(dependent)
+            if definition is None or dependent in self._reflattening:
+                continue
+
+            (template, prefix) = definition
+            old_prefix = self.prefix
+            self._reflattening.add(dependent)
+            try:
+                self.prefix = prefix
+                template.store_triples(self)
+            finally:
+                self.prefix = old_prefix
+                self._reflattening.discard(dependent)
+
+    @contextlib.contextmanager
+    def recording_expansions(self):
+        """Collect the URIs of the templates expanded inside the block."""
+        outer = self._expanded
+        self._expanded = set()
+        try:
+            yield self._expanded
+        finally:
+            if outer is not None:
+                outer |= self._expanded
+            self._expanded = outer
+
+    @contextlib.contextmanager
+    def recording_reads(self):
+        """
+        Collect the URIs looked up in the symbol table inside the block,
+        including those behind cached identifier resolutions.
+        """
+        outer = self._reads
+        self._reads = set()
+        try:
+            yield self._reads
+        finally:
+            if outer is not None:
+                outer |= self._reads
+            self._reads = outer
 
     def lookup_template(self, uri):
         triples = self._template_table[uri]
         triples = [triple for triple in triples]
         return triples
 
+    def lookup_plan(self, uri):
+        """
+        The SubstitutionPlan of template uri, compiled again if the
+        template table entry was replaced without assign_template.
+        """
+        triples = self._template_table[uri]
+        if self._expanded is not None:
+            self._expanded.add(uri)
+        plan = self._template_plans.get(uri)
+        if plan is None or plan.triples is not triples:
+            plan = SubstitutionPlan(triples)
+            self._template_plans[uri] = plan
+        return plan
+
     def assign_extensions(self, uri, extensions):
         self._extension_table[uri] = extensions
 
@@ -119,20 +262,36 @@ class Env(object):
         extension_obj = extension_class(*extension.args)    
         #Creates instance of TriplePack which just holds the triples with extra utility.
         pack = TriplePack(triples, self._symbol_table, self._template_table, self._paths)
-        return extension_obj.run(pack, self).triples
+        with self.profiling('extension', extension.name):
+            return extension_obj.run(pack, self).triples
 
     def run_extension_on_graph(self, extension):
+        """
+        Run extension on the triples of the whole graph, then remove the
+        triples it took out of them and add those it put in, leaving
+        the rest of the graph as it is.
+        """
         graph_triples = self._rdf.triples
+        before = set(graph_triples)
         graph_triples = self.run_extension_on_triples(extension, graph_triples)
-        self._rdf.remove_all()
-        assert len(self._rdf.triples) == 0
-
-        for triple in graph_triples:
-            (s, p, o) = triple
-            self._rdf.add(s, p, o)
+        try:
+            (removed, added) = triple_delta(before, graph_triples)
+        except TypeError:
+            # the extension put in terms that cannot be hashed, such as
+            # Identifiers, so replace the whole graph
+            (removed, added) = (before, graph_triples)
+
+        for (s, p, o) in removed:
+            self._rdf.remove(s, p, o)
+        self.add_triples(added)
         return graph_triples
 
     def interpret(self, forms):
+        if self._evaluator is not None:
+            return self._evaluator.interpret(self, forms)
+        return self.interpret_serially(forms)
+
+    def interpret_serially(self, forms):
         result = None
         
         for form in forms:
@@ -144,20 +303,45 @@ class Env(object):
                 result = form.evaluate(self)
         return result
 
+    def profiling(self, kind, name):
+        """A block timed as a frame kind:name by the profiler, if set."""
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.frame(kind, name)
+
     def eval_import(self, uri):
+        with self.profiling('import', uri.uri):
+            return self.import_file(uri)
+
+    def import_file(self, uri):
 
         filename = uri.uri
-        parser = Parser(filename=filename)
+        if self._snapshots is not None and self._snapshots.restore(self, filename):
+            return True
 
         import_text = self._importer.import_file(filename)
         if not import_text:
             return False
         else:
+            forms = None
+            if self._prefetcher is not None:
+                forms = self._prefetcher.take(filename, import_text)
+            if forms is None:
+                parser = Parser(filename=filename, cache=self._form_cache)
+                with self.profiling('parse', filename):
+                    forms = parser.parse(import_text)
+            self.prefetch_imports(forms)
+
             old_prefix = self.prefix
-            self.interpret(parser.parse(import_text))
+            self.interpret(forms)
             self.prefix = old_prefix
         return True
 
+    def prefetch_imports(self, forms):
+        """Start parsing the files forms import, if a prefetcher is set."""
+        if self._prefetcher is not None:
+            self._prefetcher.prefetch(forms, self._importer)
+
     def get_current_path(self):
 
         return [str(p) for p in self._importer.path]
@@ -64,6 +64,13 @@ class TemplateNotFound(RDFScriptError):
         return f'{RDFScriptError.simplified_error_message(self)}, Cannot find template: {self.template}'
 
 
+class MisplacedPragma(RDFScriptError):
+    def __init__(self, pragma, location):
+        message = '\n'
+        message += f"'{pragma}' must come before any other form when the script is streamed"
+        super().__init__(location, message)
+
+
 class NoSuchExtension(RDFScriptError):
     def __init__(self, name, location):
         message = '\n'
@@ -1,12 +1,16 @@
 
-from rdfscript.core import Argument, Node, Self, Parameter
+from rdfscript.core import Argument, Node, Self, Parameter, Identifier
 from rdfscript.pragma import ExtensionPragma
 from rdfscript.error import TemplateNotFound
+from rdfscript.plan import marshal_triple
 
 import pdb
 
 
 class Expansion(Node):
+
+    __slots__ = ('template', 'identifier', 'args', 'extensions', 'body')
+
     def __init__(self, identifier, template, args, body, location=None):
         super().__init__(location)
         self.template = template
@@ -55,45 +59,50 @@ class Expansion(Node):
 
         return processed_extensions + self.extensions
 
-    def as_triples(self, context):
-        triples = []
+    def as_triples(self, context, evaluated=None):
         template_uri = self.template.evaluate(context)
         try:
-            triples = context.lookup_template(template_uri)
+            plan = context.lookup_plan(template_uri)
         except KeyError:
             raise TemplateNotFound(template_uri, self.template.location)
 
+        triples = plan.expand(self.args, evaluated)
+
+        body = []
         for statement in self.body:
-            triples += statement.as_triples(context)
+            body += statement.as_triples(context)
 
-        def argument_marshal(triple):
-            result = triple
-            for argument in self.args:
-                result = tuple([argument.marshal(x) for x in result])
+        triples += [marshal_triple(triple, self.args) for triple in body]
 
-            return result
+        return triples
 
-        triples = [argument_marshal(triple) for triple in triples]
+    def expand(self, context):
+        """The identifier of the instance and the triples it adds."""
+        if context.profiler is None:
+            return self.expand_unprofiled(context)
 
-        return triples
+        template = self.template.evaluate(context)
+        name = getattr(template, 'uri', str(template))
+        with context.profiler.frame('template', name):
+            (identifier, triples) = self.expand_unprofiled(context)
+        context.profiler.add_triples('template', name, len(triples))
+        return (identifier, triples)
 
-    def evaluate(self, context):
+    def expand_unprofiled(self, context):
         identifier = self.identifier.evaluate(context)
-        evaluated_args = []
+        evaluated_args = {}
         for arg in self.args:
-            evaluated_arg = Argument(arg.value.evaluate(context), arg.position)
-            evaluated_args.append(evaluated_arg)
+            evaluated_args[arg.position] = arg.value.evaluate(context)
 
-        triples = self.as_triples(context)
-
-        def evaluate_triple(triple):
-            return tuple([x.evaluate(context) for x in triple])
-
-        triples = [evaluate_triple(triple) for triple in triples]
+        triples = evaluate_terms(self.as_triples(context, evaluated_args), context)
 
         for ext in self.get_extensions(context):
             triples = ext.run(context, triples)
 
+        return (identifier, triples)
+
+    def evaluate(self, context):
+        (identifier, triples) = self.expand(context)
         context.add_triples(triples)
 
         return identifier
@@ -125,3 +134,27 @@ class Expansion(Node):
 
         return num
                 
+
+
+def evaluate_terms(triples, context):
+    """
+    triples with each term evaluated. Terms that are the same object, or
+    Identifiers with the same resolution key, are evaluated once, as the
+    subject and predicates recur in nearly every triple of an expansion.
+    """
+    values = {}
+    evaluated = []
+    for triple in triples:
+        row = []
+        for term in triple:
+            key = id(term)
+            if key not in values and isinstance(term, Identifier):
+                key = term.resolution_key(context) or key
+            if key not in values:
+                values[key] = term.evaluate(context)
+            row.append(values[key])
+        evaluated.append(tuple(row))
+
+    context.term_stats['terms'] += 3 * len(triples)
+    context.term_stats['evaluated'] += len(values)
+    return evaluated
@@ -6,11 +6,17 @@ class Importer:
 
         self._dirs = [pathlib.Path(path).expanduser().resolve() for path in paths]
         self._dirs.append(pathlib.Path('.').resolve())
+        self._loaded = []
 
     @property
     def path(self):
         return self._dirs
 
+    @property
+    def loaded(self):
+        """Files read so far, in the order they were imported."""
+        return self._loaded
+
     @property
     def extension(self):
         return '.shb'
@@ -28,6 +34,7 @@ class Importer:
                 path = (d / filepath).with_suffix('.shb')
                 data = path.read_text()
                 self.add_path(path.parent)
+                self._loaded.append(path)
                 return data
             except FileNotFoundError:
                 pass
@@ -44,6 +51,19 @@ class Importer:
             path = absolute.with_suffix(self.extension)
             data = path.read_text()
             self.add_path(path.parent)
+            self._loaded.append(path)
             return data
         except FileNotFoundError:
             return None
+
+    def find_file(self, filepath):
+        """Return the path import_file would read, without reading it."""
+        for d in self._dirs:
+            path = (d / filepath).with_suffix(self.extension)
+            if path.is_file():
+                return path
+
+        path = self.to_absolute(pathlib.Path(filepath)).with_suffix(self.extension)
+        if path.is_file():
+            return path
+        return None
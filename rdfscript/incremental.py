@@ -0,0 +1,265 @@
+import bisect
+
+from .parser import Parser
+from .source import SourceMap, Location
+from .stream import FORM_START, CONTINUATION, form_boundaries, stream_lexer
+
+
+class SourceSegment:
+    """
+    The part of a document that one top-level form was parsed from.
+
+    Offsets are relative to base, the start of the form, so a form that
+    an edit moves without changing only needs its base updated. Lines
+    are looked up in the SourceMap of the document's current text.
+    """
+
+    __slots__ = ('document', 'base')
+
+    def __init__(self, document, base):
+        self.document = document
+        self.base = base
+
+    def __repr__(self):
+        return f"[SourceSegment: {self.filename}, {self.base}]"
+
+    @property
+    def filename(self):
+        return self.document.source.filename
+
+    def line(self, offset):
+        return self.document.source.line(self.base + offset)
+
+    def column(self, offset):
+        return self.document.source.column(self.base + offset)
+
+    def absolute(self, offset):
+        return self.base + offset
+
+    def location(self, offset):
+        return Location(self, offset)
+
+
+def common_prefix(a, b):
+    """Length of the longest common prefix of strings a and b."""
+    (low, high) = (0, min(len(a), len(b)))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class IncrementalParser:
+    """
+    Keeps the parse of a document up to date as it is edited.
+
+    edit() relexes and reparses only the top-level forms that an edit
+    touches, plus one form either side of it in case the edit joins
+    them, widening that window until it starts and ends on a form
+    boundary that no comment, string or URI can run across. Every other form is kept as it was, so unchanged forms
+    keep their identity, and forms after the edit are moved by
+    updating the base of their SourceSegment. The forms are always
+    equal to those Parser.parse produces for the whole text.
+
+    changed records the last update as (index, removed, added): the
+    forms at index onwards that were replaced, and how many replaced
+    them, which is what an editor needs to re-analyse.
+    """
+
+    def __init__(self, filename=None, text=''):
+        self.filename = filename
+        self._parser = Parser(filename=filename)
+        self._lexer = stream_lexer(filename)
+        self._source = None
+        self._stale = True
+        self._forms = []
+        self.changed = (0, 0, 0)
+        self.parse(text)
+
+    @property
+    def text(self):
+        return self._text
+
+    @property
+    def forms(self):
+        return list(self._forms)
+
+    @property
+    def source(self):
+        """The SourceMap of the current text, built when first needed."""
+        if self._source is None:
+            self._source = SourceMap(self.filename, self._text)
+        return self._source
+
+    def parse(self, text):
+        """Parse all of text, discarding any previous parse."""
+        self._text = text
+        self._source = None
+        self._stale = True
+        removed = len(self._forms)
+
+        parsed = self._parse_window(0, len(text))
+        if parsed is None:
+            return self._incomplete(removed)
+
+        (forms, starts, segments) = parsed
+        self._forms = forms
+        self._starts = starts
+        self._segments = segments
+        self._stale = False
+        self.changed = (0, removed, len(forms))
+        return self.forms
+
+    def update(self, text):
+        """Reparse after the whole text has been replaced by text."""
+        prefix = common_prefix(self._text, text)
+        limit = min(len(self._text), len(text)) - prefix
+        suffix = common_prefix(self._text[::-1][:limit], text[::-1][:limit])
+        return self.edit(prefix, len(self._text) - suffix,
+                         text[prefix:len(text) - suffix])
+
+    def edit(self, start, end, replacement):
+        """Reparse after the text from start to end is replaced."""
+        text = self._text[:start] + replacement + self._text[end:]
+        if self._stale or not self._forms:
+            return self.parse(text)
+
+        delta = len(replacement) - (end - start)
+        starts = self._starts
+        count = len(starts)
+        first = max(bisect.bisect_right(starts, start) - 2, 0)
+        last = min(bisect.bisect_right(starts, end), count - 1)
+
+        self._text = text
+        self._source = None
+        self._stale = True
+        while True:
+            window_start = 0 if first == 0 else starts[first]
+            window_end = len(text) if last == count - 1 else starts[last + 1] + delta
+            tokens = self._lex(text, window_start, window_end)
+
+            (clean_start, clean_end) = self._clean(tokens, text, window_start, window_end)
+            if clean_start and clean_end:
+                break
+            elif (clean_start or first == 0) and (clean_end or last == count - 1):
+                break
+            if not clean_start and first > 0:
+                first -= 1
+            if not clean_end and last < count - 1:
+                last += 1
+
+        parsed = self._parse_tokens(tokens)
+        if parsed is None:
+            return self._incomplete(count)
+
+        (forms, new_starts, segments) = parsed
+
+        moved = None
+        for index in range(last + 1, count):
+            starts[index] += delta
+            if self._segments[index] is not moved:
+                moved = self._segments[index]
+                moved.base += delta
+
+        self._forms[first:last + 1] = forms
+        self._starts[first:last + 1] = new_starts
+        self._segments[first:last + 1] = segments
+        self._stale = False
+        self.changed = (first, last + 1 - first, len(forms))
+        return self.forms
+
+    def _incomplete(self, removed):
+        # like Parser.parse, nothing is parsed from an unfinished script;
+        # it is parsed in full once it is edited again
+        self._forms = []
+        self._starts = []
+        self._segments = []
+        self.changed = (0, removed, 0)
+        return []
+
+    def _lex(self, text, start, end):
+        self._lexer.lineno = text.count('\n', 0, start) + 1
+        self._lexer.input(text[start:end])
+        tokens = list(iter(self._lexer.token, None))
+        for token in tokens:
+            token.lexpos += start
+        return tokens
+
+    def _clean(self, tokens, text, start, end):
+        """Whether the window from start to end begins and ends between forms."""
+        clean_start = start == 0 or not tokens or tokens[0].type in FORM_START
+        if clean_start and start > 0:
+            # a < the lexer could not match before the window, or a " on
+            # its line, may be closed by the edit
+            line_start = text.rfind('\n', 0, start) + 1
+            clean_start = (text.rfind('<', 0, start) <= text.rfind('>', 0, start) and
+                           text.find('"', line_start, start) == -1)
+        if end == len(text):
+            return (clean_start, True)
+
+        # a comment or string opened on the line the window ends in may
+        # run past its end, hiding any forms after it on that line
+        line_start = max(text.rfind('\n', start, end) + 1, start)
+        if (text.find('#', line_start, end) != -1 or
+                text.find('"', line_start, end) != -1):
+            return (clean_start, False)
+
+        # a URI left open here would have been lexed up to a later >
+        if text.rfind('<', start, end) > text.rfind('>', start, end):
+            return (clean_start, False)
+
+        depth = 0
+        for token in tokens:
+            if token.type == '(':
+                depth += 1
+            elif token.type == ')':
+                depth -= 1
+                if depth < 0:
+                    return (False, False)
+
+        clean_end = depth == 0 and (not tokens or tokens[-1].type not in CONTINUATION)
+        return (clean_start, clean_end)
+
+    def _parse_window(self, start, end):
+        return self._parse_tokens(self._lex(self._text, start, end))
+
+    def _parse_tokens(self, tokens):
+        """
+        Parse tokens one top-level form at a time, each in its own
+        segment. None if the last form ran into the end of the text,
+        for which Parser.parse returns None for the whole script.
+        """
+        splits = list(form_boundaries(tokens)) + [len(tokens)]
+
+        forms = []
+        starts = []
+        segments = []
+        begin = 0
+        for end in splits:
+            group = tokens[begin:end]
+            if not group:
+                continue
+
+            base = group[0].lexpos
+            for token in group:
+                token.lexpos -= base
+            segment = SourceSegment(self, base)
+            parsed = self._parser.parse_tokens(group, segment)
+            if parsed is None:
+                if end == len(tokens):
+                    return None
+                # the form did not end at this boundary after all
+                for token in group:
+                    token.lexpos += base
+                continue
+
+            for form in parsed:
+                forms.append(form)
+                starts.append(base)
+                segments.append(segment)
+            begin = end
+
+        return (forms, starts, segments)
@@ -0,0 +1,136 @@
+import concurrent.futures
+import multiprocessing
+import os
+
+from .core import Uri, Value
+from .expansion import Expansion
+
+
+def independent(form):
+    """
+    Whether form only reads the environment. An expansion reads the
+    template and symbol tables and adds triples, but defines nothing
+    that another form could read, so a run of expansions can be
+    evaluated in any order. Every other form may define symbols,
+    templates or prefixes, or act on the whole graph.
+
+    The symbols an expansion reads cannot all be known before it is
+    evaluated, as its template's triples are resolved against the
+    instance, so assignments are not moved across expansions.
+    """
+    return isinstance(form, Expansion)
+
+
+def batches(forms, limit):
+    """
+    forms in order, as lists of consecutive independent forms of at
+    most limit forms, and single forms that depend on those before.
+    """
+    batch = []
+    for form in forms:
+        if independent(form):
+            batch.append(form)
+            if len(batch) < limit:
+                continue
+        if batch:
+            yield batch
+            batch = []
+        if not independent(form):
+            yield [form]
+    if batch:
+        yield batch
+
+
+def detach(term):
+    """term without its source location, to be sent between processes."""
+    if isinstance(term, Uri):
+        return Uri(term)
+    elif isinstance(term, Value) and type(term) is Value:
+        return Value(term.value)
+    return term
+
+
+# the Env and forms being evaluated by the workers of ParallelEvaluator,
+# inherited when they are forked
+_batch = None
+
+
+def expand_range(start, end):
+    """
+    Expand forms start to end of the batch in a worker. Returns the
+    identifier and triples of each form up to the first that fails, and
+    whether one did.
+    """
+    (env, forms) = _batch
+    results = []
+    for form in forms[start:end]:
+        try:
+            (identifier, triples) = form.expand(env)
+        except Exception:
+            # left for the serial evaluation to report in context
+            return (results, True)
+        results.append((detach(identifier),
+                        [tuple(detach(term) for term in triple)
+                         for triple in triples]))
+    return (results, False)
+
+
+class ParallelEvaluator:
+    """
+    Evaluates top-level forms for Env.interpret, expanding runs of
+    consecutive expansions in worker processes.
+
+    Workers are forked for each run, so they see the template and
+    symbol tables as they are when the run starts. Each expands a
+    contiguous range of the run and the triples are added to the graph
+    in the order of the forms, so the graph is the one serial evaluation
+    gives. Every other form, including the extensions run on the whole
+    graph, is evaluated in the parent after the expansions before it.
+    Runs shorter than min_batch are expanded serially.
+    """
+
+    def __init__(self, jobs=None, min_batch=256, max_batch=1 << 14):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.stats = {'forms': 0, 'parallel': 0}
+
+    @property
+    def available(self):
+        return 'fork' in multiprocessing.get_all_start_methods()
+
+    def interpret(self, env, forms):
+        result = None
+        for batch in batches(forms, self.max_batch):
+            self.stats['forms'] += len(batch)
+            if len(batch) >= self.min_batch and self.jobs > 1 and self.available:
+                self.stats['parallel'] += len(batch)
+                result = self.expand(env, batch)
+            else:
+                result = env.interpret_serially(batch)
+        return result
+
+    def expand(self, env, forms):
+        global _batch
+
+        count = min(self.jobs * 4, len(forms))
+        starts = [k * len(forms) // count for k in range(count)]
+        ends = starts[1:] + [len(forms)]
+
+        _batch = (env, forms)
+        try:
+            context = multiprocessing.get_context('fork')
+            with concurrent.futures.ProcessPoolExecutor(max_workers=self.jobs,
+                                                        mp_context=context) as pool:
+                chunks = list(pool.map(expand_range, starts, ends))
+        finally:
+            _batch = None
+
+        result = None
+        for (start, (results, failed)) in zip(starts, chunks):
+            for (identifier, triples) in results:
+                env.add_triples(triples)
+                result = identifier
+            if failed:
+                return env.interpret_serially(forms[start + len(results):])
+        return result
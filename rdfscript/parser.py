@@ -1,6 +1,15 @@
 import ply.yacc as yacc
 import ply.lex as lex
 import logging
+import hashlib
+import importlib.util
+import os
+import pathlib
+import shutil
+import sys
+import tempfile
+import copy
+import gc
 from . import reader
 
 from .reader import tokens
@@ -24,11 +33,17 @@ from .expansion import Expansion
 
 from .error import RDFScriptSyntax
 
+from .source import SourceMap
+from .source import Location
+
 
 # script level
+# lists are built with left recursion and appended to in place, so a
+# script of n forms parses in O(n) time with a constant-depth stack.
 def p_forms(p):
-    '''forms : form forms'''
-    p[0] = [p[1]] + p[2]
+    '''forms : forms form'''
+    p[1].append(p[2])
+    p[0] = p[1]
 
 
 def p_empty_forms(p):
@@ -120,8 +135,9 @@ def p_instancebody(p):
 
 # bodies
 def p_bodystatements(p):
-    '''bodystatements : bodystatement bodystatements'''
-    p[0] = [p[1]] + p[2]
+    '''bodystatements : bodystatements bodystatement'''
+    p[1].append(p[2])
+    p[0] = p[1]
 
 
 def p_empty_bodystatements(p):
@@ -157,8 +173,9 @@ def p_not_empty_exprlist_1(p):
 
 
 def p_not_empty_exprlist_n(p):
-    '''notemptyexprlist : expr ',' notemptyexprlist'''
-    p[0] = [p[1]] + p[3]
+    '''notemptyexprlist : notemptyexprlist ',' expr'''
+    p[1].append(p[3])
+    p[0] = p[1]
 
 
 def p_symbollist(p):
@@ -173,8 +190,9 @@ def p_not_empty_symbollist_1(p):
 
 
 def p_not_empty_symbollist_n(p):
-    '''notemptysymbollist : SYMBOL ',' notemptysymbollist'''
-    p[0] = [p[1]] + p[3]
+    '''notemptysymbollist : notemptysymbollist ',' SYMBOL'''
+    p[1].append(p[3])
+    p[0] = p[1]
 
 
 def p_empty(p):
@@ -201,15 +219,16 @@ def p_dotted_list_1(p):
 
 
 def p_dotted_list_n(p):
-    '''dotted_list : name '.' dotted_list
-                   | uri '.' dotted_list
-                   | self '.' dotted_list'''
-    p[0] = [p[1]] + p[3]
+    '''dotted_list : dotted_list '.' name
+                   | dotted_list '.' uri
+                   | dotted_list '.' self'''
+    p[1].append(p[3])
+    p[0] = p[1]
 
 
 def p_name(p):
     '''name : SYMBOL'''
-    p[0] = Name(p[1], location=location(p))
+    p[0] = Name(sys.intern(p[1]), location=location(p))
 
 
 def p_self(p):
@@ -244,22 +263,158 @@ def p_error(p):
     if not p:
         pass
     else:
-        location = Location(p.lineno, p.lexpos, p.lexer.filename)
-        raise RDFScriptSyntax(p, location)
+        raise RDFScriptSyntax(p, p.lexer.source.location(p.lexpos))
 
 
 def location(p):
-    return Location(p.lineno(0), p.lexpos(0), p.parser.filename)
+    return Location(p.parser.source, p.lexpos(0))
+
+
+def grammar_hash():
+    """
+    Digest of the lexer and grammar sources, used to key the table
+    cache so that tables are rebuilt whenever either file changes.
+    """
+    digest = hashlib.sha1()
+    for source in (reader.__file__, __file__):
+        digest.update(pathlib.Path(source).read_bytes())
+    return digest.hexdigest()
+
+
+GRAMMAR_VERSION = grammar_hash()
+
+
+def cache_root():
+    """
+    Root of the on-disk caches. Overridden with the SHORTBOL_CACHE_DIR
+    environment variable.
+    """
+    root = os.environ.get('SHORTBOL_CACHE_DIR',
+                          pathlib.Path('~/.cache/shortbol').expanduser())
+    return pathlib.Path(root)
+
+
+def cache_dir():
+    """
+    Directory holding generated PLY tables, one subdirectory per
+    grammar version.
+    """
+    return cache_root() / 'tables' / GRAMMAR_VERSION[:16]
+
+
+_prebuilt = {}
+
+
+def _load_lextab(directory):
+    path = directory / 'shortbol_lextab.py'
+    if not path.exists():
+        return None
+    spec = importlib.util.spec_from_file_location('shortbol_lextab', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _load_tables(directory):
+    """
+    The (lexer, parser) read from the tables in directory, or None if
+    they are missing or cannot be read, as when a run was stopped
+    while writing them.
+    """
+    picklefile = directory / 'parsetab.pickle'
+    if not picklefile.exists():
+        return None
+    try:
+        lextab = _load_lextab(directory)
+        if lextab is None:
+            return None
+        lexer = lex.lex(module=reader, optimize=True, lextab=lextab)
+        parser = yacc.yacc(module=sys.modules[__name__],
+                           optimize=True,
+                           debug=False,
+                           write_tables=False,
+                           picklefile=str(picklefile))
+    except Exception:
+        return None
+    return (lexer, parser)
+
+
+def _write_tables(directory):
+    """
+    Build the lexer and parser, writing their tables to a new directory
+    beside directory and then moving it into place whole, so that no
+    run ever reads partly written tables.
+    """
+    building = pathlib.Path(tempfile.mkdtemp(prefix=directory.name + '.',
+                                             dir=directory.parent))
+    try:
+        lexer = lex.lex(module=reader,
+                        optimize=True,
+                        lextab='shortbol_lextab',
+                        outputdir=str(building))
+        parser = yacc.yacc(module=sys.modules[__name__],
+                           optimize=True,
+                           debug=False,
+                           write_tables=False,
+                           picklefile=str(building / 'parsetab.pickle'))
+        # unreadable tables left in the way are replaced
+        shutil.rmtree(directory, ignore_errors=True)
+        try:
+            os.replace(building, directory)
+        except OSError:
+            # another run put its tables in place first
+            pass
+    finally:
+        shutil.rmtree(building, ignore_errors=True)
+    return (lexer, parser)
+
+
+def _build_tables():
+    """
+    Build the lexer and LALR parser once per process, reading the
+    generated tables from the cache directory, or writing them there
+    when they are missing or unreadable.
+    """
+    directory = cache_dir()
+    try:
+        directory.parent.mkdir(parents=True, exist_ok=True)
+        writable = os.access(directory.parent, os.W_OK)
+    except OSError:
+        writable = False
+
+    tables = _load_tables(directory)
+    if tables is None and writable:
+        tables = _write_tables(directory)
+    if tables is None:
+        tables = (lex.lex(module=reader),
+                  yacc.yacc(module=sys.modules[__name__],
+                            debug=False,
+                            write_tables=False))
+
+    (_prebuilt['lexer'], _prebuilt['parser']) = tables
+
+
+def purge_tables():
+    """Remove the generated tables of every grammar version."""
+    shutil.rmtree(cache_root() / 'tables', ignore_errors=True)
+
+
+def prebuilt():
+    """Return the process-wide (lexer, parser) pair, building it if needed."""
+    if not _prebuilt:
+        _build_tables()
+    return _prebuilt['lexer'], _prebuilt['parser']
 
 
 def make_parser(filename=None):
-    parser = yacc.yacc()
+    parser = copy.copy(prebuilt()[1])
     parser.filename = filename
     return parser
 
 
 def make_lexer(filename=None):
-    lexer = lex.lex(module=reader)
+    lexer = prebuilt()[0].clone()
+    lexer.lineno = 1
     lexer.open_brackets = 0
     lexer.filename = filename
     return lexer
@@ -267,8 +422,10 @@ def make_lexer(filename=None):
 
 class Parser:
 
-    def __init__(self, debug_lvl=0, filename=None):
+    def __init__(self, debug_lvl=0, filename=None, cache=None):
 
+        self.filename = filename
+        self.cache = cache
         self.scanner = make_lexer(filename)
         self.debug = debug_lvl != 0
         self.dbg_logger = None
@@ -276,35 +433,72 @@ class Parser:
             self.dbg_logger = logging.getLogger()
 
         self.parser = make_parser(filename)
+        self.use_source(SourceMap(filename))
 
-    def parse(self, script):
-
-        return self.parser.parse(script,
-                                 lexer=self.scanner,
-                                 tracking=True,
-                                 debug=self.dbg_logger)
-
+    def use_source(self, source):
+        """Resolve the Locations of nodes parsed next against source."""
+        self.source = source
+        self.scanner.source = source
+        self.parser.source = source
 
-class Location:
-
-    def __init__(self, line, column, filename=None):
-        self.line = line
-        self.col = column
+    def parse(self, script):
+        if self.cache is not None:
+            forms = self.cache.load(self.filename, script)
+            if forms is not None:
+                return forms
+
+        self.use_source(SourceMap(self.filename, script))
+        forms = self._parse(script, self.scanner)
+
+        if self.cache is not None:
+            self.cache.store(self.filename, script, forms)
+        return forms
+
+    def parse_tokens(self, tokens, source):
+        """
+        Parse a list of tokens already produced by a lexer, whose
+        positions are offsets into source.
+        """
+        self.use_source(source)
+        return self._parse(None, TokenFeed(tokens, source))
+
+    def _parse(self, script, lexer):
+        # parsing only allocates acyclic AST nodes, so the cyclic
+        # collector is paused rather than letting its full passes make
+        # long scripts superlinear.
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            return self.parser.parse(script,
+                                     lexer=lexer,
+                                     tracking=True,
+                                     debug=self.dbg_logger)
+        finally:
+            if collecting:
+                gc.enable()
+
+
+class TokenFeed:
+    """Stands in for the lexer, handing the parser a list of tokens."""
+
+    def __init__(self, tokens, source):
+        self._tokens = iter(tokens)
+        self.source = source
+        self.lineno = 1
+        self.lexpos = 0
 
-        if not filename:
-            self.filename = "REPL"
-        else:
-            self.filename = filename
+    @property
+    def filename(self):
+        return self.source.filename
 
-    def __repr__(self):
-        return f"{self.line}, {self.col} in {self.filename}"
+    def input(self, data):
+        pass
 
-    @property
-    def col_on_line(self):
-        with open(self.filename) as infile:
-            characters = 0
-            for lineno, line in enumerate(infile, 1):
-                if lineno == self.line:
-                    return self.col - characters
-                characters += sum(len(word) for word in line)
-            return self.col
+    def token(self):
+        token = next(self._tokens, None)
+        if token is not None:
+            # p_error finds the source of an unexpected token through it
+            token.lexer = self
+            self.lineno = token.lineno
+            self.lexpos = token.lexpos
+        return token
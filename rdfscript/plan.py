@@ -0,0 +1,134 @@
+from .core import Identifier, Name, Parameter, Uri
+
+# a term that Argument.marshal has to handle, see compile_term
+GENERIC = 'generic'
+
+
+def compile_term(term):
+    """
+    None if expanding a template never changes term, the numbered
+    parameter slots of term if it is an Identifier with Parameter parts,
+    as (index, position) pairs, or GENERIC if it nests Identifiers.
+    """
+    if not isinstance(term, Identifier):
+        return None
+
+    slots = []
+    for (index, part) in enumerate(term.parts):
+        if isinstance(part, Identifier):
+            return GENERIC
+        elif isinstance(part, Parameter):
+            slots.append((index, part.position))
+
+    if not slots:
+        return None
+    # filled from the last part back, so splices leave indices valid
+    slots.reverse()
+    return tuple(slots)
+
+
+def substitutable(value):
+    """
+    Whether value can fill a slot without being marshalled again by
+    later arguments, i.e. it brings in no numbered Parameters of its own
+    and no nested Identifiers to flatten.
+    """
+    if isinstance(value, Parameter):
+        return value.position < 0
+    elif isinstance(value, Identifier):
+        for part in value.parts:
+            if isinstance(part, Identifier):
+                return False
+            if isinstance(part, Parameter) and part.position >= 0:
+                return False
+    return True
+
+
+def marshal(term, args):
+    for argument in args:
+        term = argument.marshal(term)
+    return term
+
+
+class SubstitutionPlan:
+    """
+    The triples of a template compiled for expansion.
+
+    Each term is either a constant, reused as it is by every expansion,
+    or an Identifier with numbered parameter slots. Expanding fills the
+    slots from the arguments in a single pass, giving the same terms as
+    marshalling every term with every Argument in turn, which rebuilds
+    each Identifier once per argument.
+    """
+
+    __slots__ = ('triples', '_rows')
+
+    def __init__(self, triples):
+        self.triples = triples
+        self._rows = []
+        for triple in triples:
+            slots = tuple(compile_term(term) for term in triple)
+            if slots == (None, None, None):
+                slots = None
+            self._rows.append((triple, slots))
+
+    def expand(self, args, evaluated=None):
+        """
+        The template's triples with args substituted for its parameters.
+
+        evaluated optionally maps argument positions to the values the
+        arguments evaluate to. A term that would be replaced by a whole
+        Identifier argument is then replaced by its value instead, so
+        that it is not evaluated again for every triple it appears in.
+        """
+        values = {}
+        for argument in args:
+            if not substitutable(argument.value):
+                return [marshal_triple(triple, args) for triple in self.triples]
+            values[argument.position] = argument.value
+
+        triples = []
+        for (triple, slots) in self._rows:
+            if slots is None:
+                triples.append(triple)
+            else:
+                triples.append(tuple(fill(term, term_slots, values, args, evaluated)
+                                     for (term, term_slots) in zip(triple, slots)))
+        return triples
+
+
+def marshal_triple(triple, args):
+    return tuple(marshal(term, args) for term in triple)
+
+
+def fill(term, slots, values, args, evaluated=None):
+    if slots is None:
+        return term
+    elif slots is GENERIC:
+        return marshal(term, args)
+
+    parts = term.parts
+    if len(parts) == 1:
+        (_, position) = slots[0]
+        if position not in values:
+            return term
+        value = values[position]
+        if isinstance(value, (Uri, Name)):
+            return Identifier(value, location=term.location)
+        elif evaluated is not None and isinstance(value, Identifier):
+            return evaluated[position]
+        return value
+
+    new_parts = None
+    for (index, position) in slots:
+        value = values.get(position)
+        if isinstance(value, (Uri, Name)):
+            new_parts = new_parts or list(parts)
+            new_parts[index] = value
+        elif isinstance(value, Identifier):
+            new_parts = new_parts or list(parts)
+            new_parts[index:index + 1] = value.parts
+
+    if new_parts is None:
+        return term
+    return Identifier(*new_parts, location=term.location)
@@ -7,6 +7,8 @@ from .error import FailToImport
 
 class PrefixPragma(Node):
 
+    __slots__ = ('_prefix', '_uri')
+
     def __init__(self, prefix, uri, location=None):
         Node.__init__(self, location)
 
@@ -41,6 +43,8 @@ class PrefixPragma(Node):
 
 class DefaultPrefixPragma(Node):
 
+    __slots__ = ('_prefix',)
+
     def __init__(self, prefix, location=None):
         Node.__init__(self, location)
 
@@ -67,6 +71,8 @@ class DefaultPrefixPragma(Node):
 
 class ImportPragma(Node):
 
+    __slots__ = ('_target',)
+
     def __init__(self, target, location=None):
         Node.__init__(self, location)
 
@@ -97,6 +103,9 @@ class ImportPragma(Node):
 
 
 class ExtensionPragma(Node):
+
+    __slots__ = ('name', 'args')
+
     def __init__(self, name, args, location=None):
         super().__init__(location)
         self.name = name
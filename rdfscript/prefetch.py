@@ -0,0 +1,126 @@
+import concurrent.futures
+import os
+import pickle
+
+from .core import Uri, Identifier
+from .pragma import ImportPragma
+from .parser import Parser
+from .cache import FormCache
+
+
+def import_targets(forms):
+    """
+    Names imported by the top-level use pragmas in forms that can be
+    known without evaluation, i.e. those naming a single <uri>.
+    """
+    targets = []
+    for form in forms:
+        if isinstance(form, ImportPragma):
+            target = form.target
+            if (isinstance(target, Identifier) and
+                    len(target.parts) == 1 and
+                    isinstance(target.parts[0], Uri)):
+                targets.append(target.parts[0].uri)
+    return targets
+
+
+def parse_import(name, path, cache_dir=None):
+    """
+    Parse one imported file, as Env.eval_import would label it.
+    Runs in a worker process, so the forms are returned pickled along
+    with the names the file imports in turn.
+    """
+    text = path.read_text()
+    cache = FormCache(directory=cache_dir) if cache_dir else None
+    try:
+        forms = Parser(filename=name, cache=cache).parse(text)
+    except Exception:
+        # left for the serial parse to report in context
+        return (name, path, text, None, [])
+
+    return (name, path, text,
+            pickle.dumps(forms, protocol=pickle.HIGHEST_PROTOCOL),
+            import_targets(forms))
+
+
+class ImportPrefetcher:
+    """
+    Parses the transitive imports of a file concurrently in worker
+    processes, ahead of Env.eval_import reaching them.
+
+    Import paths are resolved up front with the importer's current
+    directories plus the directories of the files found so far, which
+    is what the importer itself will have added by then. Prefetched
+    forms are only used when Env.eval_import later reads exactly the
+    same text under the same name, so a file resolved differently is
+    simply parsed again; evaluation order is unchanged.
+    """
+
+    def __init__(self, jobs=None, form_cache=None, threshold=2):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.threshold = threshold
+        self._cache_dir = None
+        if form_cache is not None and form_cache.enabled:
+            self._cache_dir = form_cache.directory
+
+        self._parsed = {}
+        self._seen = set()
+
+        self.prefetched = 0
+        self.used = 0
+
+    @property
+    def stats(self):
+        return {'prefetched': self.prefetched, 'used': self.used}
+
+    def resolve(self, name, dirs):
+        for d in dirs:
+            path = (d / name).with_suffix('.shb')
+            if path.is_file():
+                return path.resolve()
+        return None
+
+    def prefetch(self, forms, importer):
+        dirs = list(importer.path)
+        pending = []
+        for name in import_targets(forms):
+            self._enqueue(name, dirs, pending)
+
+        if len(pending) < self.threshold:
+            # not worth starting workers, let eval_import parse them
+            self._seen.difference_update(pending)
+            return
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            running = {pool.submit(parse_import, name, path, self._cache_dir)
+                       for (name, path) in pending}
+            while running:
+                (done, running) = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    (name, path, text, payload, targets) = future.result()
+                    if payload is not None:
+                        self._parsed.setdefault(name, []).append((text, payload))
+                        self.prefetched += 1
+
+                    if path.parent not in dirs:
+                        dirs.append(path.parent)
+                    found = []
+                    for target in targets:
+                        self._enqueue(target, dirs, found)
+                    running |= {pool.submit(parse_import, n, p, self._cache_dir)
+                                for (n, p) in found}
+
+    def _enqueue(self, name, dirs, pending):
+        path = self.resolve(name, dirs)
+        if path is not None and (name, path) not in self._seen:
+            self._seen.add((name, path))
+            pending.append((name, path))
+
+    def take(self, name, text):
+        """Fresh forms for name if it was prefetched from text, else None."""
+        for (parsed_text, payload) in self._parsed.get(name, []):
+            if parsed_text == text:
+                self.used += 1
+                return pickle.loads(payload)
+        return None
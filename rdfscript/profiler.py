@@ -0,0 +1,96 @@
+import contextlib
+import json
+import time
+
+
+def label(kind, name):
+    """A frame of a collapsed stack, which may not contain ';' or spaces."""
+    return f"{kind}:{name}".replace(';', '_').replace(' ', '_')
+
+
+class Profiler:
+    """
+    Times the evaluation of an Env: each expansion under the URI of its
+    template, each import with the parsing of its file, and each run of
+    an extension. Frames nest as evaluation does, so the time of a frame
+    is split into its own and that of the frames inside it.
+
+    report() gives, for each kind of frame and name, how many times it
+    ran, its cumulative and self time in seconds and the triples it
+    produced. collapsed() gives the self time of every distinct stack of
+    frames in microseconds, one stack per line, as read by flamegraph.pl
+    and compatible tools.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self._stack = []
+        self._children = [0.0]
+        self.stacks = {}
+        self.frames = {}
+
+    def entry(self, kind, name):
+        key = (kind, name)
+        if key not in self.frames:
+            self.frames[key] = {'count': 0, 'cumulative': 0.0,
+                                'self': 0.0, 'triples': 0}
+        return self.frames[key]
+
+    @contextlib.contextmanager
+    def frame(self, kind, name):
+        key = (kind, name)
+        self._stack.append(key)
+        self._children.append(0.0)
+        start = self.clock()
+        try:
+            yield
+        finally:
+            elapsed = self.clock() - start
+            own = elapsed - self._children.pop()
+            self._children[-1] += elapsed
+
+            stack = tuple(label(*frame) for frame in self._stack)
+            self.stacks[stack] = self.stacks.get(stack, 0.0) + own
+            self._stack.pop()
+
+            entry = self.entry(kind, name)
+            entry['count'] += 1
+            entry['self'] += own
+            # a template expanded within itself is only counted once
+            if key not in self._stack:
+                entry['cumulative'] += elapsed
+
+    def add_triples(self, kind, name, count):
+        self.entry(kind, name)['triples'] += count
+
+    def of_kind(self, kind):
+        return {name: dict(entry)
+                for ((frame_kind, name), entry) in self.frames.items()
+                if frame_kind == kind}
+
+    def report(self):
+        imports = {}
+        parses = self.of_kind('parse')
+        for (name, entry) in self.of_kind('import').items():
+            parse = parses.get(name, {}).get('cumulative', 0.0)
+            imports[name] = {'count': entry['count'],
+                             'parse': parse,
+                             'evaluate': entry['cumulative'] - parse}
+
+        return {'total': sum(self.stacks.values()),
+                'templates': self.of_kind('template'),
+                'imports': imports,
+                'extensions': self.of_kind('extension')}
+
+    def collapsed(self):
+        lines = []
+        for (stack, seconds) in sorted(self.stacks.items()):
+            lines.append(f"{';'.join(stack)} {round(seconds * 1e6)}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write the report to path as JSON and the stacks to path.folded."""
+        with open(path, 'w') as outfile:
+            json.dump(self.report(), outfile, indent=2, sort_keys=True)
+        with open(str(path) + '.folded', 'w') as outfile:
+            outfile.write(self.collapsed())
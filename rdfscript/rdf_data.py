@@ -1,12 +1,14 @@
 import rdflib
 import pdb
+import uuid
+import itertools
+import io
 
 from .core import Uri, Value, Identifier
 from .error import InternalError, PrefixError
+from .writers import write_ntriples, write_turtle, write_sbol_xml, term_order
 import os
 import sys
-from pysbolgraph.SBOL2Serialize import serialize_sboll2
-from pysbolgraph.SBOL2Graph import SBOL2Graph
 
 
 class RDFData(object):
@@ -16,10 +18,12 @@ class RDFData(object):
     language objects Uri and Value.
     """
 
-    def __init__(self, serializer=None):
+    def __init__(self, serializer=None, version=None):
 
         self._g = rdflib.Graph()
         self._serializer = serializer
+        self._version = version
+        self._index_namespaces()
 
     @property
     def namespace(self):
@@ -32,7 +36,7 @@ class RDFData(object):
                 result = result + part
             return self.to_rdf(result)
         if isinstance(language_object, Uri):
-            return rdflib.URIRef(language_object.uri)
+            return language_object.to_rdflib()
         elif isinstance(language_object, Value):
             return rdflib.Literal(language_object.value)
         else:
@@ -41,7 +45,7 @@ class RDFData(object):
 
     def from_rdf(self, rdf_object):
         if isinstance(rdf_object, rdflib.URIRef):
-            return Uri(rdf_object.toPython(), None)
+            return Uri(rdf_object, None)
         elif isinstance(rdf_object, rdflib.Literal):
             return Value(rdf_object.toPython(), None)
         elif isinstance(rdf_object, rdflib.Namespace):
@@ -58,6 +62,40 @@ class RDFData(object):
         else:
             self._g.add(triple)
 
+    def add_triples(self, triples):
+        """
+        Add triples of language objects to the graph in one bulk
+        insertion, converting each distinct term once.
+        """
+        to_rdf = self.converter()
+        graph = self._g
+        # straight to the store, as the terms are rdflib nodes already
+        graph.store.addN((to_rdf(s), to_rdf(p), to_rdf(o), graph) for (s, p, o) in triples)
+
+    def converter(self):
+        """
+        to_rdf for converting many language objects, remembering the
+        rdflib term of each distinct Value.
+        """
+        converted = {}
+        to_rdf = self.to_rdf
+
+        def convert(language_object):
+            if type(language_object) is Uri:
+                return language_object.to_rdflib()
+            elif type(language_object) is Value:
+                value = language_object.value
+                try:
+                    key = (type(value), value)
+                    term = converted.get(key)
+                except TypeError:
+                    return to_rdf(language_object)
+                if term is None:
+                    term = converted[key] = to_rdf(language_object)
+                return term
+            return to_rdf(language_object)
+        return convert
+
     def remove(self, s, p, o):
         triple = (self.to_rdf(s), self.to_rdf(p), self.to_rdf(o))
 
@@ -85,31 +123,123 @@ class RDFData(object):
     def bind_prefix(self, prefix, uri):
         u = self.to_rdf(uri)
         self._g.bind(prefix, u)
+        self._index_namespaces()
         return prefix
 
-    def uri_for_prefix(self, prefix):
+    def namespaces(self):
+        """The bound (prefix, namespace) pairs, namespaces as strings."""
+        return [(prefix, str(namespace))
+                for (prefix, namespace) in self._g.namespaces()]
 
-        namespaces = self._g.namespaces()
-        matching = [n for (p, n) in namespaces if p == prefix]
+    def _index_namespaces(self):
+        """
+        Rebuild the prefix and namespace lookups from the graph's
+        bindings. rdflib decides which prefix a namespace ends up bound
+        to, so they are read back after every bind rather than mirrored.
+        """
+        self._namespaces = {}
+        self._prefixes = {}
+        self._trie = {}
+        for (prefix, namespace) in self.namespaces():
+            self._namespaces[prefix] = namespace
+            self._prefixes.setdefault(namespace, []).append(prefix)
 
-        if len(matching) == 1:
-            return self.from_rdf(rdflib.Namespace(matching[0]))
-        elif len(matching) == 0:
+            node = self._trie
+            for character in namespace:
+                node = node.setdefault(character, {})
+            node[None] = namespace
+
+    def uri_for_prefix(self, prefix):
+
+        namespace = self._namespaces.get(prefix)
+        if namespace is None:
             raise PrefixError(None, None)
-        else:
-            raise InternalError(prefix)
+        return Uri(namespace, None)
 
     def prefix_for_uri(self, uri):
 
-        u = self.to_rdf(uri)
-        namespaces = self._g.namespaces()
-        matching = [p for (p, n) in namespaces if n == u]
+        matching = self._prefixes.get(self._uri_string(uri), ())
 
         if len(matching) == 1:
             return matching[0]
         elif len(matching) == 0:
             raise PrefixError(uri, uri.location)
 
+    def longest_namespace(self, uri):
+        """
+        The longest bound namespace that uri starts with, or None.
+        """
+        node = self._trie
+        longest = node.get(None)
+        for character in self._uri_string(uri):
+            node = node.get(character)
+            if node is None:
+                break
+            longest = node.get(None, longest)
+        return longest
+
+    def split_uri(self, uri):
+        """
+        uri as (prefix, local name) using the longest bound namespace
+        it starts with, or None if it starts with none of them.
+        """
+        namespace = self.longest_namespace(uri)
+        if namespace is None:
+            return None
+
+        prefixes = self._prefixes[namespace]
+        return (prefixes[0], self._uri_string(uri)[len(namespace):])
+
+    def _uri_string(self, uri):
+        if isinstance(uri, Uri):
+            return uri.uri
+        elif isinstance(uri, str):
+            return str(uri)
+        return self.to_rdf(uri).toPython()
+
+    def rdf_triples(self):
+        """The triples as rdflib terms, one at a time."""
+        return self._g.triples((None, None, None))
+
+    def subject_groups(self, sort=False):
+        """Each subject with its (predicate, object) pairs, as rdflib terms."""
+        subjects = dict.fromkeys(self._g.subjects())
+        if sort:
+            subjects = sorted(subjects, key=term_order)
+        for subject in subjects:
+            pairs = list(self._g.predicate_objects(subject))
+            if sort:
+                pairs.sort(key=lambda pair: (term_order(pair[0]), term_order(pair[1])))
+            yield (subject, pairs)
+
+    def subject_pairs(self):
+        """
+        The subjects, and a function giving the (predicate, object)
+        pairs of one of them, as rdflib terms.
+        """
+        def pairs(subject):
+            return self._g.predicate_objects(subject)
+        return (dict.fromkeys(self._g.subjects()), pairs)
+
+    def write(self, outfile, sort=False):
+        """
+        Write the graph serialised to the text file outfile. N-Triples
+        and Turtle are written a triple or a subject at a time, and SBOL
+        RDF/XML a TopLevel at a time, rather than built whole; sort
+        orders them to be deterministic.
+        """
+        if self._serializer == 'nt':
+            write_ntriples(self.rdf_triples(), outfile, sort)
+        elif self._serializer == 'turtle':
+            write_turtle(self.subject_groups(sort), self.namespaces(),
+                         self.split_uri, outfile)
+        elif self._serializer == 'sbolxml':
+            (subjects, pairs) = self.subject_pairs()
+            write_sbol_xml(subjects, pairs, self.namespaces(),
+                           self._version, outfile)
+        else:
+            outfile.write(self.serialise())
+
     def serialise(self):
         if self._serializer == 'rdfxml':
             return self._g.serialize(format='xml').decode("utf-8")
@@ -120,6 +250,285 @@ class RDFData(object):
         elif self._serializer == 'turtle':
             return self._g.serialize(format='turtle').decode("utf-8")
         elif self._serializer == 'sbolxml':
-            pysbolG = SBOL2Graph()
-            pysbolG += self._g
-            return serialize_sboll2(pysbolG).decode("utf-8")
+            out = io.StringIO()
+            self.write(out)
+            return out.getvalue()
+
+
+class MemoryData(RDFData):
+    """
+    RDFData that keeps the triples as language objects in memory, for
+    checking a script without building or serialising an rdflib graph.
+
+    Prefixes are bound as rdflib binds them in a new Graph, so they
+    resolve exactly as they would in a full compile.
+    """
+
+    # the prefixes a new rdflib Graph starts with
+    initial_namespaces = [('xml', 'http://www.w3.org/XML/1998/namespace'),
+                          ('rdf', 'http://www.w3.org/1999/02/22-rdf-syntax-ns#'),
+                          ('rdfs', 'http://www.w3.org/2000/01/rdf-schema#'),
+                          ('xsd', 'http://www.w3.org/2001/XMLSchema#')]
+
+    def __init__(self):
+        self._serializer = None
+        self._identifier = 'N' + uuid.uuid4().hex
+        self._triples = {}
+        self._namespace_of = dict(self.initial_namespaces)
+        self._prefix_of = {ns: prefix for (prefix, ns) in self.initial_namespaces}
+        self._index_namespaces()
+
+    @property
+    def namespace(self):
+        return Uri(self._identifier, None)
+
+    def to_rdf(self, language_object):
+        """language_object as it would come back out of an rdflib graph."""
+        if isinstance(language_object, Identifier):
+            result = Uri('')
+            for part in language_object.parts:
+                result = result + part
+            return self.to_rdf(result)
+        if isinstance(language_object, Uri):
+            return Uri(language_object, None)
+        elif isinstance(language_object, Value):
+            return Value(language_object.value, None)
+        else:
+            raise InternalError(language_object,
+                                language_object.location)
+
+    def _uri_string(self, uri):
+        return self.to_rdf(uri).uri
+
+    def add(self, s, p, o, unique=False):
+        triple = (self.to_rdf(s), self.to_rdf(p), self.to_rdf(o))
+        if unique:
+            for existing in list(self._triples):
+                if existing[:2] == triple[:2]:
+                    del self._triples[existing]
+        self._triples[triple] = None
+
+    def add_triples(self, triples):
+        to_rdf = self.to_rdf
+        self._triples.update(dict.fromkeys((to_rdf(s), to_rdf(p), to_rdf(o))
+                                           for (s, p, o) in triples))
+
+    def remove(self, s, p, o):
+        triple = (self.to_rdf(s), self.to_rdf(p), self.to_rdf(o))
+        self._triples.pop(triple, None)
+
+    def remove_all(self):
+        self._triples = {}
+
+    @property
+    def triples(self):
+        return list(self._triples)
+
+    def bind_prefix(self, prefix, uri):
+        self._bind(prefix, self._uri_string(uri))
+        self._index_namespaces()
+        return prefix
+
+    def _bind(self, prefix, namespace):
+        # rdflib's NamespaceManager.bind with override, on a Memory store
+        if prefix is None:
+            prefix = ''
+        bound = self._namespace_of.get(prefix)
+        if bound and bound != namespace:
+            if not prefix:
+                prefix = 'default'
+            num = 1
+            while True:
+                new_prefix = f'{prefix}{num}'
+                bound = self._namespace_of.get(new_prefix)
+                if bound and bound == namespace:
+                    return
+                if not bound:
+                    break
+                num += 1
+            self._store_bind(new_prefix, namespace)
+        elif self._prefix_of.get(namespace) != prefix:
+            self._store_bind(prefix, namespace)
+
+    def _store_bind(self, prefix, namespace):
+        self._prefix_of[namespace] = prefix
+        self._namespace_of[prefix] = namespace
+
+    def namespaces(self):
+        return list(self._namespace_of.items())
+
+    def serialise(self):
+        return ''
+
+    def write(self, outfile, sort=False):
+        outfile.write(self.serialise())
+
+
+class EncodedData(RDFData):
+    """
+    RDFData that keeps the triples dictionary-encoded rather than in an
+    rdflib graph, for large designs.
+
+    Each distinct term is given an integer id and kept once, as the
+    language object it reads back as. A triple is held as a single
+    integer packing its three ids, in an insertion-ordered dict that
+    both stores the triples and finds them to remove. URIs are keyed by
+    their interned term, and literals by their rdflib term when first
+    seen, so terms are the same when rdflib would take them to be.
+
+    Prefixes are bound in an empty rdflib graph as they are by RDFData,
+    and the triples are only put in it while it is serialised.
+    """
+
+    # bits of a packed triple given to each term id
+    id_bits = 32
+
+    def __init__(self, serializer=None, version=None):
+        super().__init__(serializer=serializer, version=version)
+        self._ids = {}
+        self._terms = []
+        self._triples = {}
+
+    def keys(self, language_object):
+        """
+        The key language_object's id is found under without converting
+        it, or None, and a function giving the key it is stored under,
+        or None if that is the same key.
+        """
+        if type(language_object) is Uri:
+            return (language_object._term, None)
+        elif type(language_object) is Value:
+            value = language_object.value
+            try:
+                hash(value)
+                return ((type(value), value), self.term_key)
+            except TypeError:
+                pass
+        return (None, self.term_key)
+
+    def term_key(self, language_object):
+        rdf = self.to_rdf(language_object)
+        if isinstance(rdf, rdflib.URIRef):
+            return Uri(rdf)._term
+        return rdf
+
+    def encode(self, language_object):
+        (alias, key_of) = self.keys(language_object)
+        term_id = self._ids.get(alias)
+        if term_id is None:
+            key = alias if key_of is None else key_of(language_object)
+            term_id = self._ids.get(key)
+            if term_id is None:
+                term_id = len(self._terms)
+                self._ids[key] = term_id
+                self._terms.append(self.from_rdf(self.to_rdf(language_object)))
+            if alias is not None:
+                self._ids[alias] = term_id
+        return term_id
+
+    def lookup(self, language_object):
+        """The id of language_object, or None if no triple has used it."""
+        (alias, key_of) = self.keys(language_object)
+        term_id = self._ids.get(alias)
+        if term_id is None and key_of is not None:
+            term_id = self._ids.get(key_of(language_object))
+        return term_id
+
+    def pack(self, s, p, o):
+        return (((s << self.id_bits) | p) << self.id_bits) | o
+
+    def unpack(self, key):
+        mask = (1 << self.id_bits) - 1
+        return (key >> 2 * self.id_bits, (key >> self.id_bits) & mask, key & mask)
+
+    def add(self, s, p, o, unique=False):
+        (s, p, o) = (self.encode(s), self.encode(p), self.encode(o))
+        if unique:
+            for key in list(self._triples):
+                if self.unpack(key)[:2] == (s, p):
+                    del self._triples[key]
+        self._triples[self.pack(s, p, o)] = None
+
+    def add_triples(self, triples):
+        ids = self._ids
+        encode = self.encode
+
+        def known(language_object):
+            # the id under the alias keys gives, for terms seen before
+            if type(language_object) is Uri:
+                term_id = ids.get(language_object._term)
+                if term_id is not None:
+                    return term_id
+            return encode(language_object)
+
+        shift = self.id_bits
+        stored = self._triples
+        for (s, p, o) in triples:
+            stored[(((known(s) << shift) | known(p)) << shift) | known(o)] = None
+
+    def remove(self, s, p, o):
+        ids = (self.lookup(s), self.lookup(p), self.lookup(o))
+        if None not in ids:
+            self._triples.pop(self.pack(*ids), None)
+
+    def remove_all(self):
+        self._triples = {}
+
+    def decoded(self, terms):
+        mask = (1 << self.id_bits) - 1
+        shift = self.id_bits
+        for key in self._triples:
+            yield (terms[key >> 2 * shift], terms[(key >> shift) & mask], terms[key & mask])
+
+    @property
+    def triples(self):
+        return list(self.decoded(self._terms))
+
+    def rdf_triples(self):
+        return self.decoded([self.to_rdf(term) for term in self._terms])
+
+    def subject_groups(self, sort=False):
+        terms = [self.to_rdf(term) for term in self._terms]
+        shift = self.id_bits
+        mask = (1 << shift) - 1
+        groups = itertools.groupby(sorted(self._triples), key=lambda key: key >> 2 * shift)
+        if sort:
+            groups = sorted(((subject, list(keys)) for (subject, keys) in groups),
+                            key=lambda group: term_order(terms[group[0]]))
+        for (subject, keys) in groups:
+            pairs = [(terms[(key >> shift) & mask], terms[key & mask]) for key in keys]
+            if sort:
+                pairs.sort(key=lambda pair: (term_order(pair[0]), term_order(pair[1])))
+            yield (terms[subject], pairs)
+
+    def subject_pairs(self):
+        terms = [self.to_rdf(term) for term in self._terms]
+        shift = self.id_bits
+        mask = (1 << shift) - 1
+        keys = sorted(self._triples)
+        runs = {}
+        start = 0
+        for (subject, run) in itertools.groupby(keys, key=lambda key: key >> 2 * shift):
+            end = start + sum(1 for _ in run)
+            runs[terms[subject]] = (start, end)
+            start = end
+
+        def pairs(subject):
+            (start, end) = runs.get(subject, (0, 0))
+            return [(terms[(key >> shift) & mask], terms[key & mask])
+                    for key in keys[start:end]]
+        return (runs, pairs)
+
+    def serialise(self):
+        if self._serializer == 'sbolxml':
+            return super().serialise()
+        self._g.addN(triple + (self._g,) for triple in self.rdf_triples())
+        try:
+            return super().serialise()
+        finally:
+            self._g.remove((None, None, None))
+
+
+# the stores Env can keep a full compile's triples in, by name
+stores = {'rdflib': RDFData,
+          'encoded': EncodedData}
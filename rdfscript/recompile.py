@@ -0,0 +1,192 @@
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+
+from .core import Node, Uri
+from .expansion import Expansion
+from .parser import cache_root
+from .cache import code_version
+from .parallel import detach
+
+
+def describe(value):
+    """
+    A nested tuple of strings that is equal for two values exactly when
+    they evaluate the same, leaving out where they are in the source.
+    """
+    if isinstance(value, Uri):
+        return ('Uri', value.uri)
+    elif isinstance(value, Node):
+        parts = [type(value).__name__]
+        for cls in type(value).__mro__:
+            if cls is not Node:
+                for slot in cls.__dict__.get('__slots__', ()):
+                    parts.append(describe(getattr(value, slot, None)))
+        return tuple(parts)
+    elif isinstance(value, (list, tuple)):
+        return ('list',) + tuple(describe(item) for item in value)
+    return (type(value).__name__, repr(value))
+
+
+def fingerprint(value):
+    return hashlib.blake2b(repr(describe(value)).encode('utf-8'),
+                           digest_size=16).digest()
+
+
+class ExpansionRecord:
+    """
+    What evaluating one expansion read and produced: the fingerprints of
+    the symbols it looked up and of the templates it expanded, as they
+    were, and its identifier and triples.
+    """
+
+    __slots__ = ('symbols', 'templates', 'identifier', 'triples')
+
+    def __init__(self, symbols, templates, identifier, triples):
+        self.symbols = symbols
+        self.templates = templates
+        self.identifier = identifier
+        self.triples = triples
+
+
+class IncrementalEvaluator:
+    """
+    Evaluates top-level forms for Env.interpret, reusing the triples of
+    the expansions of the previous compile of the same script.
+
+    Each expansion is recorded under the fingerprint of the form and of
+    the prefixes it was resolved with, together with the symbols and
+    templates it read. On the next compile an expansion that is
+    unchanged, and whose symbols and templates are too, adds the
+    recorded triples instead of being evaluated, so after an edit only
+    the changed expansions and those depending on what changed are
+    evaluated again. Every other form is evaluated as usual, and the
+    extensions on the whole graph are run on it as a whole.
+
+    Extensions run on an expansion can read any symbol through their
+    TriplePack without it being recorded, so expansions that run any
+    are not recorded and are evaluated on every compile.
+
+    The records of a compile replace those of the one before, in a file
+    keyed by the script path, the SBOL version and the interpreter
+    sources.
+    """
+
+    def __init__(self, path, version=None, directory=None, enabled=True):
+        if directory is None:
+            directory = cache_root() / 'recompile'
+        self._dir = directory
+        self.enabled = enabled
+        self._key = self.key(path, version)
+
+        self._previous = self.load() if enabled else {}
+        self._records = {}
+        self._context = (None, None)
+        self._symbols = {}
+        self._templates = {}
+
+        self.stats = {'reused': 0, 'evaluated': 0}
+
+    def key(self, path, version):
+        digest = hashlib.sha256()
+        for part in (code_version(), os.path.abspath(path), str(version)):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    @property
+    def path(self):
+        return os.path.join(self._dir, self._key + '.pickle')
+
+    def load(self):
+        try:
+            with open(self.path, 'rb') as infile:
+                return pickle.load(infile)
+        except Exception:
+            return {}
+
+    def save(self):
+        if not self.enabled:
+            return False
+
+        tmp = None
+        try:
+            os.makedirs(self._dir, exist_ok=True)
+            (fd, tmp) = tempfile.mkstemp(dir=self._dir)
+            with os.fdopen(fd, 'wb') as outfile:
+                pickle.dump(self._records, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.path)
+        except (OSError, pickle.PicklingError, RecursionError):
+            if tmp is not None and os.path.exists(tmp):
+                os.remove(tmp)
+            return False
+        return True
+
+    def purge(self):
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+    def interpret(self, env, forms):
+        result = None
+        for form in forms:
+            if isinstance(form, Expansion):
+                result = self.expand(env, form)
+            else:
+                result = env.interpret_serially([form])
+        return result
+
+    def context(self, env):
+        """Fingerprint of the prefixes that identifiers resolve with."""
+        (generation, context) = self._context
+        if generation != env._generation:
+            context = fingerprint((env.prefix, env._rdf.namespaces()))
+            self._context = (env._generation, context)
+        return context
+
+    def symbol(self, env, uri):
+        value = env._symbol_table.get(Uri(uri))
+        (known, digest) = self._symbols.get(uri, (None, None))
+        if known is not value or digest is None:
+            digest = fingerprint(value)
+            self._symbols[uri] = (value, digest)
+        return digest
+
+    def template(self, env, uri):
+        triples = env._template_table.get(Uri(uri))
+        extensions = env._extension_table.get(Uri(uri))
+        (known, digest) = self._templates.get(uri, ((None, None), None))
+        if known[0] is not triples or known[1] is not extensions or digest is None:
+            digest = fingerprint((triples, extensions))
+            self._templates[uri] = ((triples, extensions), digest)
+        return digest
+
+    def current(self, env, record):
+        return (all(self.symbol(env, uri) == digest
+                    for (uri, digest) in record.symbols) and
+                all(self.template(env, uri) == digest
+                    for (uri, digest) in record.templates))
+
+    def expand(self, env, form):
+        key = (fingerprint(form), self.context(env))
+        record = self._records.get(key) or self._previous.get(key)
+        if record is None or not self.current(env, record):
+            with env.recording_reads() as reads, env.recording_expansions() as expanded:
+                (identifier, triples) = form.expand(env)
+            self.stats['evaluated'] += 1
+
+            if form.extensions or any(env.lookup_extensions(uri) for uri in expanded):
+                env.add_triples(triples)
+                return identifier
+
+            symbols = tuple((uri.uri, self.symbol(env, uri.uri)) for uri in reads)
+            templates = tuple((uri.uri, self.template(env, uri.uri)) for uri in expanded)
+            record = ExpansionRecord(symbols, templates, detach(identifier),
+                                     [tuple(detach(term) for term in triple)
+                                      for triple in triples])
+        else:
+            self.stats['reused'] += 1
+
+        self._records[key] = record
+        env.add_triples(record.triples)
+        return record.identifier
@@ -0,0 +1,195 @@
+import hashlib
+import os
+import pathlib
+import pickle
+import shutil
+import tempfile
+
+from .core import Uri
+from .env import Env
+from .parser import cache_root
+from .cache import code_version
+
+
+def file_stamp(path):
+    stat = os.stat(path)
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+
+class LibrarySnapshot:
+    """
+    The Env state produced by importing a library into an empty
+    environment: the symbol, template and extension tables, what each
+    template was flattened from, the prefixes it bound, any triples it
+    added and the paths it put on the import path. Applying it to an Env is equivalent to evaluating
+    the import, as long as none of the files it read have changed.
+    """
+
+    def __init__(self, symbols, templates, extensions,
+                 namespaces, triples, paths, files,
+                 definitions=None, dependents=None):
+        self.symbols = symbols
+        self.templates = templates
+        self.extensions = extensions
+        self.definitions = definitions or {}
+        self.dependents = dependents or {}
+        self.namespaces = namespaces
+        self.triples = triples
+        self.paths = paths
+        self.files = files
+
+    def is_current(self):
+        try:
+            return all(file_stamp(path) == (path, mtime, size)
+                       for (path, mtime, size) in self.files)
+        except OSError:
+            return False
+
+    def apply(self, env):
+        for (prefix, namespace) in self.namespaces:
+            env.bind_prefix(prefix, Uri(namespace))
+
+        env._symbol_table.update(self.symbols)
+        env.invalidate_resolutions()
+        env._template_table.update(self.templates)
+        env._template_definitions.update(self.definitions)
+        for (base, dependents) in self.dependents.items():
+            env._template_dependents.setdefault(base, set()).update(dependents)
+        env._extension_table.update(self.extensions)
+        env.add_triples(self.triples)
+
+        for path in self.paths:
+            if pathlib.Path(path) not in env._importer.path:
+                env._importer.add_path(path)
+
+
+class LibrarySnapshots:
+    """
+    Binary snapshots of evaluated standard libraries, used by
+    Env.eval_import in place of parsing and evaluating the library.
+
+    A snapshot depends on the library name, where it was found, the
+    import path the files it uses are looked up on, the namespace of
+    the default prefix it is imported under (sbol_2.shb defines its
+    aliases there) and the interpreter sources. It is rebuilt
+    automatically when any file it read has changed.
+    """
+
+    def __init__(self, directory=None, enabled=True,
+                 libraries=('sbol_2', 'sbol_3')):
+        if directory is None:
+            directory = cache_root() / 'snapshots'
+        self._dir = directory
+        self.enabled = enabled
+        self.libraries = set(libraries)
+        self._code_version = None
+
+        self.hits = 0
+        self.builds = 0
+
+    @property
+    def directory(self):
+        return self._dir
+
+    @property
+    def stats(self):
+        return {'hits': self.hits, 'builds': self.builds}
+
+    def purge(self):
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+    def key(self, name, path, namespace, paths=()):
+        if self._code_version is None:
+            self._code_version = code_version()
+
+        digest = hashlib.sha256()
+        for part in (self._code_version, name, str(path), namespace.uri,
+                     *map(str, paths)):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self._dir, key + '.pickle')
+
+    def load(self, key):
+        try:
+            with open(self.path(key), 'rb') as infile:
+                snapshot = pickle.load(infile)
+        except Exception:
+            return None
+
+        if not snapshot.is_current():
+            return None
+        return snapshot
+
+    def save(self, key, snapshot):
+        tmp = None
+        try:
+            os.makedirs(self._dir, exist_ok=True)
+            (fd, tmp) = tempfile.mkstemp(dir=self._dir)
+            with os.fdopen(fd, 'wb') as outfile:
+                pickle.dump(snapshot, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.path(key))
+        except (OSError, pickle.PicklingError, RecursionError):
+            if tmp is not None and os.path.exists(tmp):
+                os.remove(tmp)
+            return False
+        return True
+
+    def build(self, env, name, namespace):
+        """Evaluate library name in a fresh Env prefixed like env."""
+        library = Env(paths=[str(p) for p in env._importer.path],
+                      version=env.version,
+                      form_cache=env._form_cache,
+                      prefetcher=env._prefetcher,
+                      check=env.check,
+                      profiler=env.profiler,
+                      store=env.store)
+        library.bind_prefix(env.prefix, namespace)
+        library.prefix = env.prefix
+
+        before = set(library._rdf.namespaces())
+        if not library.eval_import(Uri(name)):
+            return None
+
+        namespaces = [(prefix, ns)
+                      for (prefix, ns) in library._rdf.namespaces()
+                      if (prefix, ns) not in before]
+
+        self.builds += 1
+        return LibrarySnapshot(library._symbol_table,
+                               library._template_table,
+                               library._extension_table,
+                               namespaces,
+                               library._rdf.triples,
+                               [str(p) for p in library._importer.path],
+                               [file_stamp(p) for p in library._importer.loaded],
+                               library._template_definitions,
+                               library._template_dependents)
+
+    def restore(self, env, name):
+        """
+        Apply the snapshot of library name to env, building it first
+        if needed. Returns False if name should be imported normally.
+        """
+        if not self.enabled or name not in self.libraries or env.prefix is None:
+            return False
+
+        path = env._importer.find_file(name)
+        if path is None:
+            return False
+
+        namespace = env.uri_for_prefix(env.prefix)
+        key = self.key(name, path, namespace, env._importer.path)
+        snapshot = self.load(key)
+        if snapshot is None:
+            snapshot = self.build(env, name, namespace)
+            if snapshot is None:
+                return False
+            self.save(key, snapshot)
+        else:
+            self.hits += 1
+
+        snapshot.apply(env)
+        return True
@@ -0,0 +1,88 @@
+import bisect
+from array import array
+
+
+class SourceMap:
+    """
+    Line start offsets of one parsed script.
+
+    Language objects keep only the SourceMap they came from and a
+    character offset into it; lines and columns are found by binary
+    search when a Location is needed, e.g. for a diagnostic.
+    """
+
+    __slots__ = ('filename', '_starts', '_end')
+
+    def __init__(self, filename=None, text=''):
+        self.filename = filename if filename else "REPL"
+        self._starts = array('q', [0])
+        self._end = 0
+        self.extend(text)
+
+    def __repr__(self):
+        return f"[SourceMap: {self.filename}, {len(self._starts)} lines]"
+
+    def extend(self, text):
+        """Record text that follows everything recorded so far."""
+        starts = self._starts
+        base = self._end
+        position = text.find('\n')
+        while position != -1:
+            starts.append(base + position + 1)
+            position = text.find('\n', position + 1)
+        self._end = base + len(text)
+
+    def line(self, offset):
+        return bisect.bisect_right(self._starts, offset)
+
+    def column(self, offset):
+        return offset - self._starts[self.line(offset) - 1]
+
+    def absolute(self, offset):
+        """The offset from the start of the script, which offset already is."""
+        return offset
+
+    def location(self, offset):
+        return Location(self, offset)
+
+
+class Location:
+    """
+    A position in a script: an offset into a SourceMap.
+
+    col is the offset from the start of the script, as reported by the
+    lexer; col_on_line is the column within the line.
+    """
+
+    __slots__ = ('source', 'offset')
+
+    def __init__(self, source, offset):
+        self.source = source
+        self.offset = offset
+
+    def __repr__(self):
+        return f"{self.line}, {self.col} in {self.filename}"
+
+    def __eq__(self, other):
+        return (isinstance(other, Location) and
+                self.filename == other.filename and
+                self.col == other.col)
+
+    def __hash__(self):
+        return hash((self.filename, self.col))
+
+    @property
+    def line(self):
+        return self.source.line(self.offset)
+
+    @property
+    def col(self):
+        return self.source.absolute(self.offset)
+
+    @property
+    def filename(self):
+        return self.source.filename
+
+    @property
+    def col_on_line(self):
+        return self.source.column(self.offset)
@@ -0,0 +1,173 @@
+import mmap
+import sys
+
+from .parser import Parser, make_lexer
+from .source import SourceMap
+
+
+# tokens that can begin a top-level form
+FORM_START = {'SYMBOL', 'URI', 'SELF',
+              'PREFIX', 'USE', 'INCLUDE', 'EXTENSION',
+              'INTEGER', 'DOUBLE', 'STRING', 'BOOLEAN'}
+
+# tokens after which the current form cannot have ended
+CONTINUATION = {'=', '.', ',', '(', 'ISA',
+                'PREFIX', 'USE', 'INCLUDE', 'EXTENSION'}
+
+
+def form_boundaries(tokens):
+    """
+    Yield the indices of tokens that begin a new top-level form: ones
+    outside any brackets that can start a form and that follow a token
+    after which a form may end.
+    """
+    depth = 0
+    previous = None
+    for (index, token) in enumerate(tokens):
+        if (depth == 0 and
+                previous is not None and
+                previous not in CONTINUATION and
+                token.type in FORM_START):
+            yield index
+
+        if token.type == '(':
+            depth += 1
+        elif token.type == ')':
+            depth -= 1
+        previous = token.type
+
+
+def stream_lexer(filename=None):
+    """A lexer that stops at the end of its input, even inside brackets."""
+    lexer = make_lexer(filename)
+    lexer.lexeoff = None
+    lexer.lexstateeoff = {}
+    return lexer
+
+
+class MmapLines:
+    """readlines() over a memory mapped file, decoded as utf-8."""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            self._map = None
+
+    def readlines(self, hint):
+        lines = []
+        if self._map is None:
+            return lines
+
+        size = 0
+        while size < hint:
+            line = self._map.readline()
+            if not line:
+                break
+            lines.append(line.decode('utf-8'))
+            size += len(line)
+        return lines
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+class FormStream:
+    """
+    Iterates over the top-level forms of a script read incrementally
+    from source, any object with a readlines(hint) method such as an
+    open file, sys.stdin or MmapLines.
+
+    Text is read a block of lines at a time and lexed. Tokens up to the
+    last form boundary in the block are parsed and their forms yielded,
+    and the text of the unfinished form is carried into the next block,
+    so only the current block and the forms being evaluated are
+    resident. Locations refer to positions in the whole script.
+
+    URIs spanning several lines are not supported in this mode.
+    """
+
+    def __init__(self, source, filename=None, block_size=1 << 16):
+        self._source = source
+        self._filename = filename
+        self._block_size = block_size
+
+    @classmethod
+    def from_path(cls, path, use_mmap=False, **kwargs):
+        if path == '-':
+            return cls(sys.stdin, filename='<stdin>', **kwargs)
+        elif use_mmap:
+            return cls(MmapLines(path), filename=path, **kwargs)
+        else:
+            return cls(open(path, 'r', encoding='utf8'), filename=path, **kwargs)
+
+    def close(self):
+        if self._source is not sys.stdin:
+            self._source.close()
+
+    def __iter__(self):
+        parser = Parser(filename=self._filename)
+        lexer = stream_lexer(self._filename)
+        source = SourceMap(self._filename)
+
+        carry = ''
+        offset = 0
+        line = 1
+        wanted = self._block_size
+        try:
+            while True:
+                block = ''.join(self._source.readlines(wanted))
+                text = carry + block
+                if not block:
+                    break
+                source.extend(block)
+
+                lexer.lineno = line
+                lexer.input(text)
+                tokens = list(iter(lexer.token, None))
+
+                split = None
+                for split in form_boundaries(tokens):
+                    pass
+
+                if split is None:
+                    # one form fills the block, read more before relexing
+                    carry = text
+                    wanted = max(self._block_size, 2 * len(text))
+                    continue
+
+                first = tokens[split]
+                for token in tokens[:split]:
+                    token.lexpos += offset
+                forms = parser.parse_tokens(tokens[:split], source)
+                del tokens
+                if forms is None:
+                    # the last form did not end at the boundary, read on
+                    carry = text
+                    wanted = max(self._block_size, 2 * len(text))
+                    continue
+
+                carry = text[first.lexpos:]
+                offset += first.lexpos
+                line = first.lineno
+                wanted = self._block_size
+
+                forms.reverse()
+                while forms:
+                    yield forms.pop()
+
+            lexer.lineno = line
+            lexer.input(carry)
+            tokens = list(iter(lexer.token, None))
+            for token in tokens:
+                token.lexpos += offset
+            forms = parser.parse_tokens(tokens, source) or []
+            forms.reverse()
+            while forms:
+                yield forms.pop()
+        finally:
+            self.close()
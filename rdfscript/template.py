@@ -4,6 +4,9 @@ from .expansion import Expansion
 
 
 class Template(Node):
+
+    __slots__ = ('identifier', 'parameters', 'extensions', 'body')
+
     def __init__(self, identifier, parameters, body, location=None):
         super().__init__(location)
         self.identifier = identifier
@@ -51,19 +54,20 @@ class Template(Node):
         return list(triples)
 
     def store_triples(self, context):
-        triples = self.as_triples(context)
-
         def triple_eval(triple):
             (s, p, o) = triple
             return (s.evaluate(context),
                     p.evaluate(context),
                     o.evaluate(context))
 
-        
-        evaluated_triples = [triple_eval(triple) for triple in triples]
+        with context.recording_expansions() as bases:
+            triples = self.as_triples(context)
+            evaluated_triples = [triple_eval(triple) for triple in triples]
 
         uri = self.identifier.evaluate(context)
-        context.assign_template(uri, evaluated_triples)
+        context.assign_template(uri, evaluated_triples,
+                                bases=bases,
+                                definition=(self, context.prefix))
 
         return evaluated_triples
 
@@ -97,6 +101,8 @@ class Template(Node):
 
 class Property(Node):
 
+    __slots__ = ('identifier', 'value')
+
     def __init__(self, identifier, value, location=None):
 
         Node.__init__(self, location)
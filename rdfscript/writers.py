@@ -0,0 +1,284 @@
+import re
+from xml.sax.saxutils import escape, quoteattr
+
+import rdflib
+
+from sbol_rdf_identifiers import SBOL2Namespace, SBOL2Objects, SBOL2Predicates
+from sbol_rdf_identifiers import SBOL3Namespace, SBOL3Predicates
+
+# prefixes and local names written as prefix:name, a conservative subset
+# of those Turtle allows
+PREFIX = re.compile(r'^([A-Za-z][A-Za-z0-9_-]*)?$')
+LOCAL_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_-]*$')
+NON_ASCII = re.compile('[^\x00-\x7f]')
+
+
+def ascii_escape(match):
+    code = ord(match.group())
+    return ('\\u%04X' if code <= 0xFFFF else '\\U%08X') % code
+
+
+def ntriples_literal(literal):
+    """literal as N-Triples writes it, on one line."""
+    quoted = '"%s"' % (literal.replace('\\', '\\\\')
+                       .replace('\n', '\\n')
+                       .replace('"', '\\"')
+                       .replace('\r', '\\r'))
+    if literal.language:
+        return f"{quoted}@{literal.language}"
+    elif literal.datatype:
+        return f"{quoted}^^<{literal.datatype}>"
+    return quoted
+
+
+def ntriples_line(triple):
+    """
+    triple of rdflib terms as a line of N-Triples, which is ASCII, so
+    other characters are written as \\u or \\U escapes.
+    """
+    line = ' '.join(ntriples_literal(term) if isinstance(term, rdflib.Literal)
+                    else term.n3() for term in triple) + ' .\n'
+    if line.isascii():
+        return line
+    return NON_ASCII.sub(ascii_escape, line)
+
+
+def write_ntriples(triples, outfile, sort=False):
+    """
+    Write triples of rdflib terms to the text file outfile as
+    N-Triples, one line at a time, or sorted to be deterministic.
+    """
+    lines = map(ntriples_line, triples)
+    if sort:
+        lines = sorted(lines)
+    outfile.writelines(lines)
+    outfile.write('\n')
+
+
+class TurtleWriter:
+    """
+    Writes the triples of each subject in turn to a text file as
+    Turtle, abbreviating URIs with the bound prefixes.
+
+    split gives a URI string as (prefix, local name), using the longest
+    bound namespace it starts with, or None.
+    """
+
+    def __init__(self, outfile, namespaces, split):
+        self.outfile = outfile
+        self.split = split
+        self.prefixes = {prefix for (prefix, _) in namespaces if PREFIX.match(prefix)}
+
+        for (prefix, namespace) in namespaces:
+            if prefix in self.prefixes:
+                outfile.write(f"@prefix {prefix}: <{namespace}> .\n")
+        outfile.write('\n')
+
+    def term(self, term):
+        if isinstance(term, rdflib.URIRef):
+            split = self.split(term)
+            if split is not None:
+                (prefix, name) = split
+                if prefix in self.prefixes and LOCAL_NAME.match(name):
+                    return f"{prefix}:{name}"
+        return term.n3()
+
+    def write(self, subject, pairs):
+        rows = [f"    {self.term(p)} {self.term(o)}" for (p, o) in pairs]
+        self.outfile.write(f"{self.term(subject)}\n" + ' ;\n'.join(rows) + ' .\n\n')
+
+
+def write_turtle(groups, namespaces, split, outfile):
+    """
+    Write to outfile the (subject, [(predicate, object), ...]) groups of
+    rdflib terms as Turtle, a subject at a time.
+    """
+    writer = TurtleWriter(outfile, namespaces, split)
+    for (subject, pairs) in groups:
+        writer.write(subject, pairs)
+
+
+def term_order(term):
+    return (type(term).__name__, str(term))
+
+
+RDF_NS = str(rdflib.RDF)
+# XML names that can follow a prefix, a conservative subset of NCName
+NCNAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_.-]*$')
+
+
+def sbol_namespace(version):
+    if version == 'sbol_3':
+        return SBOL3Namespace().sbol.uri
+    return SBOL2Namespace().sbol.uri
+
+
+def ownership(version):
+    """
+    A function telling if a (predicate, types of the subject) pair owns
+    its object in SBOL version, by the ownership predicates of
+    sbol_rdf_identifiers.
+    """
+    if version == 'sbol_3':
+        predicates = SBOL3Predicates(SBOL3Namespace())
+        owning = {p.to_rdflib() for p in predicates.ownership_predicates}
+        return lambda predicate, types: predicate in owning
+
+    namespaces = SBOL2Namespace()
+    predicates = SBOL2Predicates(namespaces)
+    owning = {p.to_rdflib() for p in predicates.ownership_predicates}
+    # SBOL2 uses component both for the Components a ComponentDefinition
+    # owns and for the one a SequenceAnnotation refers to
+    component = predicates.component.to_rdflib()
+    annotation = SBOL2Objects(namespaces).sequence_annotation.to_rdflib()
+
+    def owns(predicate, types):
+        if predicate == component:
+            return annotation not in types
+        return predicate in owning
+    return owns
+
+
+class SBOLXMLWriter:
+    """
+    Writes a graph to a text file as SBOL RDF/XML: each TopLevel as an
+    element named by its type, with the children it owns nested inside
+    it, rather than every subject as a separate rdf:Description.
+
+    subjects are the graph's subjects and pairs gives a subject's
+    (predicate, object) pairs, as rdflib terms; the graph is read
+    through them rather than copied. version is the SBOL version whose
+    ownership predicates nest children, and whose namespace is written
+    with the prefix sbol.
+    """
+
+    def __init__(self, outfile, namespaces, subjects, pairs, version):
+        self.outfile = outfile
+        self.pairs = pairs
+        reserved = {'xml', 'rdf', 'sbol'}
+        self.namespaces = {RDF_NS: 'rdf', sbol_namespace(version): 'sbol'}
+        for (prefix, namespace) in namespaces:
+            if NCNAME.match(prefix) and prefix not in reserved:
+                self.namespaces.setdefault(namespace, prefix)
+        self.qnames = {}
+        owns = ownership(version)
+
+        self.types = {}
+        owned = {}
+        for subject in subjects:
+            subject_pairs = list(pairs(subject))
+            types = sorted((obj for (predicate, obj) in subject_pairs
+                            if predicate == rdflib.RDF.type), key=str)
+            if types:
+                self.types[subject] = types
+                self.qname(types[0], element=True)
+            for (predicate, obj) in subject_pairs:
+                self.qname(predicate)
+                if obj != subject and owns(predicate, types):
+                    owned.setdefault(subject, []).append((str(predicate), str(obj), predicate, obj))
+        self.subjects = sorted(subjects, key=self.top_level_order)
+
+        # each child is nested in the first subject, in order, owning it
+        self.owners = {}
+        for subject in self.subjects:
+            for (_, _, predicate, obj) in sorted(owned.get(subject, ())):
+                if obj in self.types:
+                    self.owners.setdefault(obj, (subject, predicate))
+        self.written = set()
+
+    def qname(self, uri, element=False):
+        """
+        uri as prefix:name, declaring a prefix for its namespace if
+        none is bound, or None if it cannot be written as an XML name.
+        """
+        if uri in self.qnames:
+            return self.qnames[uri]
+
+        qname = None
+        for (namespace, prefix) in self.namespaces.items():
+            name = uri[len(namespace):]
+            if uri.startswith(namespace) and NCNAME.match(name):
+                if qname is None or len(name) < len(qname[1]):
+                    qname = (prefix, name)
+        if qname is None:
+            split = max(uri.rfind('#'), uri.rfind('/')) + 1
+            if split and NCNAME.match(uri[split:]):
+                prefix = f"ns{len(self.namespaces)}"
+                while prefix in self.namespaces.values():
+                    prefix += '_'
+                self.namespaces[uri[:split]] = prefix
+                qname = (prefix, uri[split:])
+        if qname is None and not element:
+            raise ValueError(f"Cannot write predicate {uri} as an XML name.")
+
+        self.qnames[uri] = qname and f"{qname[0]}:{qname[1]}"
+        return self.qnames[uri]
+
+    def top_level_order(self, subject):
+        types = self.types.get(subject)
+        return (types is None, str(types[0]) if types else '', str(subject))
+
+    def write(self):
+        out = self.outfile
+        out.write('<?xml version="1.0" encoding="utf-8"?>\n<rdf:RDF')
+        for (namespace, prefix) in self.namespaces.items():
+            out.write(f"\n  xmlns:{prefix}={quoteattr(namespace)}")
+        out.write('>\n')
+        for subject in self.subjects:
+            if subject not in self.owners:
+                self.write_subject(subject, 1)
+        # children whose owners own each other, so none is a TopLevel
+        for subject in self.subjects:
+            if subject not in self.written:
+                self.write_subject(subject, 1)
+        out.write('</rdf:RDF>\n')
+
+    def write_subject(self, subject, depth):
+        self.written.add(subject)
+        out = self.outfile
+        indent = '  ' * depth
+        types = self.types.get(subject, ())
+        element = self.qname(types[0], element=True) if types else None
+        if element is None:
+            (element, types) = ('rdf:Description', [None] + list(types))
+        out.write(f"{indent}<{element} {node_attribute(subject, 'rdf:about')}>\n")
+
+        pairs = sorted(self.pairs(subject),
+                       key=lambda pair: (term_order(pair[0]), term_order(pair[1])))
+        for (predicate, obj) in pairs:
+            if predicate == rdflib.RDF.type and obj in types[:1]:
+                continue
+            name = self.qname(predicate)
+            if self.owners.get(obj, (None, None)) == (subject, predicate) \
+               and obj not in self.written:
+                out.write(f"{indent}  <{name}>\n")
+                self.write_subject(obj, depth + 2)
+                out.write(f"{indent}  </{name}>\n")
+            elif isinstance(obj, rdflib.Literal):
+                out.write(f"{indent}  <{name}{literal_attributes(obj)}>"
+                          f"{escape(str(obj))}</{name}>\n")
+            else:
+                out.write(f"{indent}  <{name} {node_attribute(obj, 'rdf:resource')}/>\n")
+        out.write(f"{indent}</{element}>\n")
+
+
+def node_attribute(term, attribute):
+    if isinstance(term, rdflib.BNode):
+        return f"rdf:nodeID={quoteattr(str(term))}"
+    return f"{attribute}={quoteattr(str(term))}"
+
+
+def literal_attributes(literal):
+    if literal.language:
+        return f" xml:lang={quoteattr(literal.language)}"
+    if literal.datatype:
+        return f" rdf:datatype={quoteattr(str(literal.datatype))}"
+    return ''
+
+
+def write_sbol_xml(subjects, pairs, namespaces, version, outfile):
+    """
+    Write the graph read through subjects and pairs to outfile as SBOL
+    RDF/XML of version, as SBOLXMLWriter does.
+    """
+    SBOLXMLWriter(outfile, namespaces, list(subjects), pairs, version).write()
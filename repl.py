@@ -19,7 +19,7 @@ class REPL:
                        extensions=optextensions)
 
         self.parser = Parser()
-        self.reader = self.parser.scanner
+        self.text = ''
         self.out_file = out
 
     def start(self):
@@ -42,10 +42,10 @@ class REPL:
         if not s:
             self.read()
 
-        self.reader.input(s)
+        self.text = s
 
     def evaluate(self):
-        form = self.parser.parser.parse(lexer=self.reader)
+        form = self.parser.parse(self.text)
         result = self.env.interpret(form)
 
         self.pprint(result)
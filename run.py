@@ -3,10 +3,19 @@ import argparse
 import logging
 import os
 import re
-from rdfscript.parser import Parser
+from rdfscript.parser import Parser, purge_tables
 from rdfscript.env import Env
-from rdfscript.pragma import PrefixPragma,DefaultPrefixPragma,ExtensionPragma
+from rdfscript.cache import FormCache
+from rdfscript.snapshot import LibrarySnapshots
+from rdfscript.pragma import PrefixPragma,DefaultPrefixPragma,ExtensionPragma,ImportPragma
+from rdfscript.stream import FormStream
+from rdfscript.prefetch import ImportPrefetcher
+from rdfscript.chunked import ChunkedParser
+from rdfscript.parallel import ParallelEvaluator
+from rdfscript.recompile import IncrementalEvaluator
+from rdfscript.profiler import Profiler
 from rdfscript.core import Uri,Identifier,Name
+from rdfscript.error import MisplacedPragma
 from repl import REPL
 from validate_sbol import validate_sbol
 
@@ -18,29 +27,87 @@ def parse_from_file(filepath,
                     extensions=[],
                     debug_lvl=1, 
                     version="sbol_2",
-                    no_validation = None):
+                    no_validation = None,
+                    cache=True,
+                    cache_script=False,
+                    purge_cache=False,
+                    cache_stats=False,
+                    stream=False,
+                    use_mmap=False,
+                    jobs=1,
+                    incremental=False,
+                    profile=None,
+                    store='rdflib',
+                    sort=False):
     
-    if version == "sbol_3" and serializer == "sbolxml":
-        serializer = "rdfxml"
     if len(optpaths) == 0:
         optpaths.append("templates")
 
-    parser = Parser(filename=filepath, debug_lvl=debug_lvl)
-
-    with open(filepath, 'r', encoding="utf8") as in_file:
-        data = in_file.read()
-
+    form_cache = FormCache(enabled=cache)
+    snapshots = LibrarySnapshots(enabled=cache)
+    if purge_cache:
+        form_cache.purge()
+        snapshots.purge()
+        purge_tables()
+    prefetcher = None
+    evaluator = None
+    if jobs != 1:
+        prefetcher = ImportPrefetcher(jobs=jobs, form_cache=form_cache)
+        evaluator = ParallelEvaluator(jobs=jobs)
+    if profile is not None:
+        # expansions in worker processes would not be timed
+        evaluator = None
+    if incremental:
+        evaluator = IncrementalEvaluator(filepath, version=version, enabled=cache)
+        if purge_cache:
+            evaluator.purge()
 
     env = Env(filename=filepath,
               serializer=serializer,
               paths=optpaths,
               extensions=extensions,
-              version = version)
-
-    forms = parser.parse(data)
-    forms = pre_process(forms,version)
-    env.interpret(forms)
-    sbol = str(env)
+              version = version,
+              form_cache=form_cache,
+              snapshots=snapshots,
+              prefetcher=prefetcher,
+              evaluator=evaluator,
+              profiler=Profiler() if profile is not None else None,
+              store=store)
+
+    # only imported files are cached unless asked, as every edit of the
+    # script would leave another entry behind
+    script_cache = form_cache if cache_script else None
+    if stream:
+        forms = FormStream.from_path(filepath, use_mmap=use_mmap)
+        forms = stream_pre_process(forms,version)
+    else:
+        if jobs != 1:
+            parser = ChunkedParser(filename=filepath, debug_lvl=debug_lvl,
+                                   cache=script_cache, jobs=jobs)
+        else:
+            parser = Parser(filename=filepath, debug_lvl=debug_lvl, cache=script_cache)
+        with open(filepath, 'r', encoding="utf8") as in_file:
+            data = in_file.read()
+        forms = parser.parse(data)
+        env.prefetch_imports(forms)
+        forms = pre_process(forms,version)
+    with env.profiling('script', filepath):
+        env.interpret(forms)
+    if profile is not None:
+        env.profiler.write(profile)
+    if incremental:
+        evaluator.save()
+    if cache_stats:
+        print(f"Form cache: {form_cache.stats}")
+        print(f"Library snapshots: {snapshots.stats}")
+        if prefetcher is not None:
+            print(f"Import prefetch: {prefetcher.stats}")
+        if isinstance(evaluator, ParallelEvaluator):
+            print(f"Parallel evaluation: {evaluator.stats}")
+        if incremental:
+            print(f"Incremental evaluation: {evaluator.stats}")
+        print(f"Expansion terms: {env.term_stats}")
+    sbol = None
 
     ret_code = ""
     if not no_validation:
@@ -50,6 +117,7 @@ def parse_from_file(filepath,
             errors = []
         else:
             errors = []
+            sbol = str(env)
             response = validate_sbol(sbol)
             try:
                 if response['valid']:
@@ -67,20 +135,90 @@ def parse_from_file(filepath,
         ret_code = "No Validation."
         errors = ["No Validation."]
 
-    if out is None:
-        print(sbol)
+    if sbol is not None and not sort:
+        if out is None:
+            print(sbol)
+        else:
+            with open(out, 'w') as o:
+                o.write(sbol)
+    # written as it is serialised, without holding the whole document
+    elif out is None:
+        env.write(sys.stdout, sort=sort)
+        print()
     else:
         with open(out, 'w') as o:
-            o.write(sbol)
+            env.write(o, sort=sort)
 
 
     return {ret_code : errors}
 
-def pre_process(forms,version):
+def check_file(filepath,
+               optpaths=[],
+               extensions=[],
+               debug_lvl=1,
+               version="sbol_2",
+               cache=True):
+    '''
+    Parses and evaluates filepath, resolving its templates and running
+    its extensions, on triples kept in memory rather than an rdflib
+    graph. Nothing is serialised or sent to the validator, and the SBOL
+    identity extension, which only rewrites URIs for the output, is not
+    run.
+
+    Returns a list of diagnostics, empty if the script is valid. Each is
+    a dict with the type of error, its message and, where known, the
+    file, line and column it was found at. Errors without a location of
+    their own are given that of the form being evaluated. A form that
+    fails is reported and checking carries on with the next one, but a
+    script that does not parse gives only the syntax error.
+    '''
+    if len(optpaths) == 0:
+        optpaths.append("templates")
+
+    form_cache = FormCache(enabled=cache)
+    env = Env(filename=filepath,
+              paths=optpaths,
+              extensions=extensions,
+              version = version,
+              form_cache=form_cache,
+              snapshots=LibrarySnapshots(enabled=cache),
+              check=True)
+
+    try:
+        parser = Parser(filename=filepath, debug_lvl=debug_lvl)
+        with open(filepath, 'r', encoding="utf8") as in_file:
+            forms = parser.parse(in_file.read())
+        forms = pre_process(forms, version, identity=False)
+    except Exception as e:
+        return [diagnostic(e, None, filepath)]
+
+    diagnostics = []
+    for form in forms:
+        try:
+            env.interpret([form])
+        except Exception as e:
+            diagnostics.append(diagnostic(e, getattr(form, 'location', None), filepath))
+    return diagnostics
+
+
+def diagnostic(error, location=None, filename=None):
+    '''
+    The structured form of an error raised while checking a script, at
+    its own location if it has one, else at location, else in filename.
+    '''
+    location = getattr(error, 'location', None) or location
+    return {'type': type(error).__name__,
+            'message': str(error).strip(),
+            'file': filename if location is None else location.filename,
+            'line': None if location is None else location.line,
+            'column': None if location is None else location.col_on_line}
+
+
+def pre_process(forms,version,identity=True):
     '''
     We want to add a default prefix if one isnt present.
     Also, add the new include extension if not present.
-    Also, add the sbol_identity extension
+    Also, add the sbol_identity extension, unless identity is False.
     '''   
     
     default_prefix_name = "shb_ns"
@@ -110,7 +248,9 @@ def pre_process(forms,version):
     
     if include_ns not in extensions:
         forms.insert(pos + 1,include_ns)
-    if version == "sbol_2":
+    if not identity:
+        pass
+    elif version == "sbol_2":
         sbol_identity = ExtensionPragma("SBOL2",[])
         if sbol_identity not in extensions:
             forms.append(sbol_identity)
@@ -122,6 +262,72 @@ def pre_process(forms,version):
     return forms
 
 
+def build_snapshot(version="sbol_2", optpaths=[]):
+    '''
+    Evaluates the standard library for version once, under the default
+    prefix that pre_process would add, and writes its snapshot so later
+    compiles load it instead of evaluating the templates.
+    '''
+    if len(optpaths) == 0:
+        optpaths.append("templates")
+
+    snapshots = LibrarySnapshots()
+    snapshots.purge()
+    env = Env(paths=optpaths,
+              version=version,
+              form_cache=FormCache(),
+              snapshots=snapshots)
+
+    forms = [x for x in pre_process([], version)
+             if isinstance(x, (PrefixPragma, DefaultPrefixPragma))]
+    env.interpret(forms)
+    env.eval_import(Uri(version))
+    return snapshots.stats
+
+
+def stream_pre_process(forms,version):
+    '''
+    pre_process for a stream of forms. The leading pragmas (up to the
+    first other form) are pre-processed as a list, then the rest of the
+    stream is passed through one form at a time. The sbol identity
+    extension is run after the last form unless the script already
+    contains it.
+
+    A later pragma that would have changed what pre_process added to
+    the head, such as the script's first @prefix, raises
+    MisplacedPragma, as the head has already been evaluated.
+    '''
+    forms = iter(forms)
+    head = []
+    for form in forms:
+        head.append(form)
+        if not isinstance(form, (PrefixPragma, DefaultPrefixPragma, ImportPragma, ExtensionPragma)):
+            break
+
+    identity = ExtensionPragma("SBOL2" if version == "sbol_2" else "SBOL3",[])
+    include = ExtensionPragma("Include",Identifier(Uri(version)))
+    seen_identity = identity in head
+    settled = (any(isinstance(x, PrefixPragma) for x in head),
+               any(isinstance(x, DefaultPrefixPragma) for x in head),
+               include in head)
+    head = pre_process(head,version)
+    if not seen_identity and head and head[-1] == identity:
+        head.pop()
+
+    yield from head
+    for form in forms:
+        if form == identity:
+            seen_identity = True
+        elif (isinstance(form, PrefixPragma) and not settled[0] or
+              isinstance(form, DefaultPrefixPragma) and not settled[1] or
+              form == include and not settled[2]):
+            raise MisplacedPragma(form, form.location)
+        yield form
+
+    if not seen_identity:
+        yield identity
+
+
 def rdf_repl(serializer='nt',
              out=None,
              optpaths=[],
@@ -141,7 +347,7 @@ def rdf_repl(serializer='nt',
 
     repl.start()
 
-def produce_tables(version = "sbol_2", lib_paths = None):
+def produce_tables(version = "sbol_2", lib_paths = None, cache=True):
     '''
     Method that is independant from the rdf/xml production, simply runs the parsing and evaluation 
     process on the templates to produce the symbols and template tables.
@@ -156,6 +362,7 @@ def produce_tables(version = "sbol_2", lib_paths = None):
     f.write("use <" + version + ">")
     f.close()
 
+    form_cache = FormCache(enabled=cache)
     parser = Parser(filename=to_run_fn, debug_lvl=1)
 
     with open(to_run_fn, 'r') as in_file:
@@ -164,7 +371,9 @@ def produce_tables(version = "sbol_2", lib_paths = None):
     env = Env(filename=to_run_fn,
               serializer="sbolxml",
               paths=optpaths,
-              version = version)
+              version = version,
+              form_cache=form_cache,
+              snapshots=LibrarySnapshots(enabled=cache))
 
     forms = parser.parse(data)
     forms = pre_process(forms,version)
@@ -194,6 +403,30 @@ def rdfscript_args():
     parser.add_argument('-e', '--extensions', action='append', nargs=2, default=[])
     parser.add_argument('-v', '--version', help="Define which SBOL version to run (3 by default)", choices=["sbol_2","sbol_3"] , default="sbol_2")
 
+    parser.add_argument('--no-cache', help="Always parse with PLY instead of reusing cached forms.", default=False, action='store_true')
+    parser.add_argument('--cache-script', help="Also cache the parsed forms of the file being run, not only those of the files it imports.", default=False, action='store_true')
+    parser.add_argument('--purge-cache', help="Empty the parsed form cache, library snapshots and parser tables before running.", default=False, action='store_true')
+    parser.add_argument('--build-snapshot', help="Rebuild the standard library snapshot for the chosen version.", default=False, action='store_true')
+    parser.add_argument('--cache-stats', help="Report parsed form cache hits and misses.", default=False, action='store_true')
+
+    parser.add_argument('--check', help="Only check that the file parses, its templates resolve and its extensions pass, without building or validating any output.", default=False, action='store_true')
+
+    parser.add_argument('--stream', help="Read, parse and evaluate the file one form at a time ('-' reads stdin).", default=False, action='store_true')
+    parser.add_argument('--mmap', help="With --stream, read the file through a memory map.", default=False, action='store_true')
+
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="Number of processes used to parse large scripts and imported files, and to expand long runs of instances (0 for one per core).")
+
+    parser.add_argument('--incremental', help="Reuse the triples of instances that are unchanged since the last run on the same file.", default=False, action='store_true')
+
+    parser.add_argument('--profile', metavar='FILE', default=None,
+                        help="Time each template expansion, import and extension run, and write the report to FILE as JSON and the collapsed stacks, for flame graphs, to FILE.folded.")
+
+    parser.add_argument('--store', default='rdflib', choices=['rdflib', 'encoded'],
+                        help="Where the triples are kept while compiling. 'encoded' keeps them dictionary-encoded, using less memory on large designs, and only builds an rdflib graph to serialise them.")
+
+    parser.add_argument('--sort', help="Write N-Triples and Turtle output sorted, so that it is the same on every run.", default=False, action='store_true')
+
     parser.add_argument('-d', '--debug-lvl', default=1,
                         choices=[0, 1, 2],
                         help="Controls the amount of debug information generated. 0 is low/none.")
@@ -206,7 +439,19 @@ if __name__ == "__main__":
     args = rdfscript_args()
     extensions = [(ext[0], ext[1]) for ext in args.extensions]
     out = None if args.no_output else args.output  
-    if args.filename is not None:
+    if args.build_snapshot:
+        build_snapshot(args.version, args.path)
+    if args.filename is not None and args.check:
+        diagnostics = check_file(args.filename,
+                                 optpaths=args.path,
+                                 extensions=extensions,
+                                 debug_lvl=args.debug_lvl,
+                                 version=args.version,
+                                 cache=not args.no_cache)
+        for d in diagnostics:
+            print(f"{d['file']}:{d['line']}:{d['column']}: {d['type']}: {d['message']}")
+        sys.exit(1 if diagnostics else 0)
+    elif args.filename is not None:
         parse_from_file(args.filename,
                         serializer=args.serializer,
                         out=out,
@@ -214,8 +459,19 @@ if __name__ == "__main__":
                         extensions=extensions,
                         debug_lvl=args.debug_lvl,
                         version=args.version,
-                        no_validation = args.no_validation)
-    else:
+                        no_validation = args.no_validation,
+                        cache=not args.no_cache,
+                        cache_script=args.cache_script,
+                        purge_cache=args.purge_cache,
+                        cache_stats=args.cache_stats,
+                        stream=args.stream,
+                        use_mmap=args.mmap,
+                        jobs=args.jobs,
+                        incremental=args.incremental,
+                        profile=args.profile,
+                        store=args.store,
+                        sort=args.sort)
+    elif not args.build_snapshot:
         rdf_repl(serializer=args.serializer,
                  out=args.output,
                  optpaths=args.path,
@@ -11,5 +11,7 @@ setup(name='shortbol',
 
       py_modules=['run'],
 
-      install_requires=['rdflib', 'lxml', 'requests', 'ply', 'pathlib', 'pysbolgraph']
+      install_requires=['rdflib', 'lxml', 'requests', 'ply', 'pathlib'],
+
+      extras_require={'bench': ['pysbolgraph']}
 )
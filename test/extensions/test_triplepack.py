@@ -232,3 +232,50 @@ class TriplePackTest(unittest.TestCase):
 
         self.pack.set(Identifier(Name('e')).evaluate(self.env), Value('fake', None), Value('set', None))
         self.assertTrue(self.pack.has(Identifier(Name('e')).evaluate(self.env), Value('fake', None)))
+
+    def test_triples_remove_keeps_search(self):
+        e = Identifier(Name('e')).evaluate(self.env)
+        triple = (e, Value(1, None), Value(42, None))
+        self.assertTrue(self.pack.has(e, Value(1, None)))
+
+        self.pack.triples.remove(triple)
+        self.assertFalse(self.pack.has(e, Value(1, None)))
+        self.assertEqual(self.pack.search((None, None, Value(42, None))), [])
+        self.assertEqual(len(self.pack.triples), 1)
+
+    def test_triples_replace_with_type(self):
+        e = Identifier(Name('e')).evaluate(self.env)
+        f = Uri('http://triplepack.org/#f')
+        keep = Uri('http://triplepack.org/#keep')
+        other = Uri('http://triplepack.org/#other')
+        self.pack.add((other, Value(1, None), e))
+        self.pack.add((other, keep, e))
+        self.assertTrue(self.pack.has(e, Value(1, None)))
+
+        self.pack.replace_with_type(e, f, keep)
+
+        self.assertEqual(self.pack.search((e, None, None)), [])
+        self.assertEqual(self.pack.search((f, None, None)),
+                         [(f, Value(1, None), Value(42, None)),
+                          (f, Uri('http://example.eg/predicate'), Value(2, None))])
+        self.assertEqual(self.pack.search((None, None, f)), [(other, Value(1, None), f)])
+        self.assertEqual(self.pack.search((None, None, e)), [(other, keep, e)])
+        self.assertEqual([s for (s, p, o) in self.pack.triples], [f, f, other, other])
+
+    def test_triples_replace_after_remove(self):
+        e = Identifier(Name('e')).evaluate(self.env)
+        f = Uri('http://triplepack.org/#f')
+        other = Uri('http://triplepack.org/#other')
+        self.pack.add((other, Value(1, None), e))
+        self.pack.add((other, Value(2, None), other))
+        self.pack.search((e, None, None))
+
+        self.pack.triples.remove((e, Value(1, None), Value(42, None)))
+        self.pack.replace_with_type(e, f, None)
+        self.pack.replace_with_type(other, e, None)
+
+        self.assertEqual(list(self.pack.triples),
+                         [(f, Uri('http://example.eg/predicate'), Value(2, None)),
+                          (e, Value(1, None), f),
+                          (e, Value(2, None), e)])
+        self.assertEqual(self.pack.search((None, None, f)), [(e, Value(1, None), f)])
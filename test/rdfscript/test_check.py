@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+
+from run import check_file
+
+
+class CheckFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def check(self, script):
+        path = os.path.join(self.directory.name, 'script.shb')
+        with open(path, 'w') as f:
+            f.write(script)
+        return (path, check_file(path, optpaths=['templates'], cache=False))
+
+    def test_valid_script(self):
+        (_, diagnostics) = self.check('a is a Promoter()\n')
+        self.assertEqual(diagnostics, [])
+
+    def test_column_on_line(self):
+        (path, diagnostics) = self.check('a = 1\n\n\nb is a Nope()\n')
+        self.assertEqual([(d['type'], d['file'], d['line'], d['column']) for d in diagnostics],
+                         [('TemplateNotFound', path, 4, 7)])
+
+    def test_other_errors_located_at_form(self):
+        (path, diagnostics) = self.check('a = 1\nt(x)(p = x)\n\nb is a t()\n')
+        self.assertEqual([(d['type'], d['file'], d['line'], d['column']) for d in diagnostics],
+                         [('TypeError', path, 4, 0)])
+
+    def test_every_bad_form_reported(self):
+        (path, diagnostics) = self.check('a is a Nope()\nb is a Promoter()\n'
+                                         'c is a Missing()\n')
+        self.assertEqual([(d['type'], d['line'], d['column']) for d in diagnostics],
+                         [('TemplateNotFound', 1, 7), ('TemplateNotFound', 3, 7)])
+
+    def test_missing_file(self):
+        path = os.path.join(self.directory.name, 'missing.shb')
+        diagnostics = check_file(path, optpaths=['templates'], cache=False)
+        self.assertEqual([(d['type'], d['file'], d['line']) for d in diagnostics],
+                         [('FileNotFoundError', path, None)])
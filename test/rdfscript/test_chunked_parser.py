@@ -0,0 +1,74 @@
+import unittest
+
+from rdfscript.parser import Parser
+from rdfscript.chunked import ChunkedParser, open_ended
+from rdfscript.error import RDFScriptSyntax
+
+
+BLOCK = '''T(x, y)
+(
+  eg.p = x
+  eg.q = "string ( with ) brackets"
+)
+a{0} is a T({0}, 2)
+b{0} is a T(
+  a{0},
+  3)
+  (
+  eg.r = <http://eg/#frag>
+  )
+c{0} = a{0}.b
+'''
+
+SCRIPT = '@prefix eg = <http://eg/>\n@prefix eg\n' + ''.join(
+    BLOCK.format(i) for i in range(40))
+
+
+class ChunkedParserTest(unittest.TestCase):
+
+    def setUp(self):
+        self.serial = Parser(filename='chunked.shb').parse(SCRIPT)
+        self.parser = ChunkedParser(filename='chunked.shb', jobs=3, min_chunk_size=256)
+
+    def tearDown(self):
+        self.serial = None
+        self.parser = None
+
+    def test_cuts_at_line_starts(self):
+        cuts = self.parser.cuts(SCRIPT)
+
+        self.assertEqual(len(cuts), 2)
+        for cut in cuts:
+            self.assertEqual(SCRIPT[cut - 1], '\n')
+            self.assertFalse(SCRIPT[cut].isspace())
+
+    def test_same_forms_as_serial(self):
+        forms = self.parser.parse(SCRIPT)
+        self.assertEqual(forms, self.serial)
+
+    def test_locations_refer_to_whole_script(self):
+        forms = self.parser.parse(SCRIPT)
+
+        for (chunked, serial) in zip(forms, self.serial):
+            self.assertEqual(chunked.location, serial.location)
+            self.assertEqual(chunked.line, serial.line)
+        self.assertIs(forms[0].location.source, forms[-1].location.source)
+
+    def test_small_script_not_chunked(self):
+        parser = ChunkedParser(filename='chunked.shb', jobs=3)
+        self.assertEqual(parser.cuts(SCRIPT), [])
+        self.assertEqual(parser.parse(SCRIPT), self.serial)
+
+    def test_syntax_error_reported_as_serial(self):
+        broken = SCRIPT + 'e = = 1\n' + BLOCK.format('x')
+        with self.assertRaises(RDFScriptSyntax) as serial:
+            Parser(filename='chunked.shb').parse(broken)
+        with self.assertRaises(RDFScriptSyntax) as chunked:
+            self.parser.parse(broken)
+
+        self.assertEqual(str(chunked.exception), str(serial.exception))
+
+    def test_open_ended(self):
+        self.assertTrue(open_ended('a = <http://eg/\nb>', 16))
+        self.assertTrue(open_ended('x is\n a T()', 5))
+        self.assertFalse(open_ended('a = <http://eg/>\nb = 1', 17))
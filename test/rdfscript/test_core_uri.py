@@ -1,7 +1,12 @@
 import unittest
 
+import gc
+import pickle
+import weakref
+
 import rdflib
-from rdfscript.core import Name, Uri, Self, Value
+from rdfscript import core
+from rdfscript.core import Uri
 
 class CoreUriTest(unittest.TestCase):
 
@@ -44,3 +49,42 @@ class CoreUriTest(unittest.TestCase):
         self.assertNotEqual(uri4, uri1)
         self.assertNotEqual(uri4, uri2)
         self.assertNotEqual(uri4, uri3)
+
+    def test_equal_uris_share_term(self):
+
+        uri1 = Uri('http://a.org/b#c')
+        uri2 = Uri(rdflib.URIRef('http://a.org/b#c'))
+        uri3 = Uri('http://a.org/') + Uri('b#c')
+
+        self.assertIs(uri1._term, uri2._term)
+        self.assertIs(uri1._term, uri3._term)
+        self.assertIs(uri1._term, pickle.loads(pickle.dumps(uri1))._term)
+        self.assertEqual(hash(uri1), hash('http://a.org/b#c'))
+
+    def test_split_and_local_name(self):
+
+        uri = Uri('http://a.org/b#c')
+
+        self.assertEqual(uri.split(), ['http', '', '', 'a.org', 'b', 'c'])
+        self.assertEqual(uri.local_name, 'c')
+        self.assertEqual(uri.to_rdflib(), rdflib.URIRef('http://a.org/b#c'))
+        self.assertIs(uri.to_rdflib(), Uri('http://a.org/b#c').to_rdflib())
+
+    def test_extend_rebinds_term(self):
+
+        uri = Uri('http://a.org/b')
+        other = Uri('http://a.org/b')
+        uri.extend(Uri('c'))
+
+        self.assertEqual(uri, Uri('http://a.org/b#c'))
+        self.assertEqual(other.uri, 'http://a.org/b')
+
+    def test_unused_terms_freed(self):
+
+        uri = Uri('http://a.org/') + Uri('unused')
+        term = weakref.ref(uri._term)
+        del uri
+        gc.collect()
+
+        self.assertIsNone(term())
+        self.assertNotIn('http://a.org/unused', core._terms)
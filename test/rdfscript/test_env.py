@@ -8,6 +8,18 @@ sys.path.insert(1, os.path.join(sys.path[0], '..', ".."))
 from rdfscript.parser import Parser
 from rdfscript.env import Env
 from rdfscript.core import Name, Value, Uri, Identifier
+from rdfscript.pragma import ExtensionPragma
+
+
+class Relabel:
+    """Extension replacing the label of one subject."""
+
+    def __init__(self, subject):
+        self.subject = subject
+
+    def run(self, triplepack, env):
+        triplepack.set(self.subject, Uri('http://p.org/label'), Value('new'))
+        return triplepack
 
 
 class EnvTest(unittest.TestCase):
@@ -109,3 +121,74 @@ class EnvTest(unittest.TestCase):
 
         self.assertEqual(extensions, self.env.lookup_extensions(uri))
 
+
+    def test_resolution_cached_until_assigned(self):
+
+        self.env.bind_prefix('e', Uri('http://e.org/'))
+        self.env.prefix = 'e'
+        [x, y] = self.parser.parse('x.y\nx.y')
+
+        self.assertEqual(x.evaluate(self.env), Uri('http://e.org/xy'))
+        self.assertIsNotNone(self.env.cached_resolution(('e', 'x', 'y')))
+
+        # the cached value also applies prefixify to an unevaluated copy
+        self.assertEqual(y.evaluate(self.env), Uri('http://e.org/xy'))
+        self.assertEqual(y.parts[0], Uri('http://e.org/'))
+
+        self.env.assign(Uri('http://e.org/x'), Uri('http://f.org/'))
+        self.assertEqual(self.parser.parse('x.y')[0].evaluate(self.env),
+                         Uri('http://f.org/y'))
+
+    def test_resolution_invalidated_by_prefix(self):
+
+        self.env.bind_prefix('e', Uri('http://e.org/'))
+        self.env.bind_prefix('f', Uri('http://f.org/'))
+        self.env.prefix = 'e'
+        self.assertEqual(self.parser.parse('z')[0].evaluate(self.env),
+                         Uri('http://e.org/z'))
+
+        self.env.prefix = 'f'
+        self.assertEqual(self.parser.parse('z')[0].evaluate(self.env),
+                         Uri('http://f.org/z'))
+
+        self.env.bind_prefix('z', Uri('http://z.org/'))
+        self.assertEqual(self.parser.parse('z')[0].evaluate(self.env),
+                         Uri('http://z.org/'))
+
+        self.env.invalidate_resolutions()
+        self.assertEqual(self.env._resolutions, {})
+
+    def test_check_env_same_triples(self):
+
+        script = ('@prefix p = <http://p.org/>\n@prefix p\n' +
+                  't(a)(x = a\ny = 1)\n' +
+                  'e is a t(v)\nf is a t(e)')
+        check = Env(check=True)
+        check.interpret(self.parser.parse(script))
+        self.env.interpret(self.parser.parse(script))
+
+        self.assertCountEqual(check._rdf.triples, self.env._rdf.triples)
+        self.assertIsNone(getattr(check._rdf, '_g', None))
+
+    def test_graph_extension_applies_delta(self):
+
+        script = ('@prefix p = <http://p.org/>\n@prefix p\n' +
+                  't(x)(label = x)\na is a t("old")\nb is a t("b")')
+        self.env.interpret(self.parser.parse(script))
+        self.env._extension_manager.add_extra_extension(
+            'test.rdfscript.test_env.Relabel', shortname='Relabel')
+
+        writes = []
+        (add, remove) = (self.env._rdf.add_triples, self.env._rdf.remove)
+        self.env._rdf.add_triples = lambda triples: add(
+            [writes.append(('add', triple)) or triple for triple in triples])
+        self.env._rdf.remove = lambda *triple: writes.append(('remove', triple)) or remove(*triple)
+
+        a = Uri('http://p.org/a')
+        label = Uri('http://p.org/label')
+        self.env.run_extension_on_graph(ExtensionPragma('Relabel', [a]))
+
+        self.assertEqual(writes, [('remove', (a, label, Value('old'))),
+                                  ('add', (a, label, Value('new')))])
+        self.assertIn((a, label, Value('new')), self.env._rdf.triples)
+        self.assertEqual(len(self.env._rdf.triples), 2)
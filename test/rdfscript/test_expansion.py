@@ -519,3 +519,20 @@ class TestExpansionClass(unittest.TestCase):
 
 
 
+
+    def test_evaluate_terms_once(self):
+        forms = self.parser.parse('@prefix p = <http://p.org/>\n@prefix p\n' +
+                                  't(a)(x = a\ny = a\nz = 1)\n' +
+                                  'e is a t(v)')
+        for form in forms:
+            form.evaluate(self.env)
+
+        e = Uri('http://p.org/e')
+        triples = self.env._rdf.triples
+        self.assertCountEqual(triples,
+                              [(e, Uri('http://p.org/x'), Uri('http://p.org/v')),
+                               (e, Uri('http://p.org/y'), Uri('http://p.org/v')),
+                               (e, Uri('http://p.org/z'), Value(1))])
+
+        # e, x, y, z, v and 1
+        self.assertEqual(self.env.term_stats, {'terms': 9, 'evaluated': 6})
@@ -0,0 +1,84 @@
+import unittest
+import unittest.mock
+import tempfile
+import shutil
+import os
+
+from rdfscript.parser import Parser
+from rdfscript.cache import FormCache
+from run import parse_from_file
+
+
+class FormCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache = FormCache(directory=self.dir)
+        self.script = 'a = 1\nt(x)(p = x)\ne is a t(2)'
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_miss_then_hit(self):
+        parser = Parser(filename='cached.shb', cache=self.cache)
+        first = parser.parse(self.script)
+        self.assertEqual(self.cache.stats['misses'], 1)
+        self.assertEqual(self.cache.stats['stores'], 1)
+
+        second = Parser(filename='cached.shb', cache=self.cache).parse(self.script)
+        self.assertEqual(self.cache.stats['hits'], 1)
+        self.assertEqual(first, second)
+        self.assertIsNot(first[0], second[0])
+        self.assertEqual(second[2].location.line, 3)
+        self.assertEqual(second[2].location.filename, 'cached.shb')
+
+    def test_key_depends_on_text_and_filename(self):
+        key = self.cache.key('cached.shb', self.script)
+
+        self.assertNotEqual(key, self.cache.key('other.shb', self.script))
+        self.assertNotEqual(key, self.cache.key('cached.shb', self.script + ' '))
+        self.assertEqual(key, self.cache.key('cached.shb', self.script))
+
+    def test_disabled(self):
+        cache = FormCache(directory=self.dir, enabled=False)
+        Parser(cache=cache).parse(self.script)
+        Parser(cache=cache).parse(self.script)
+
+        self.assertEqual(cache.stats, {'hits': 0, 'misses': 0, 'stores': 0, 'errors': 0})
+        self.assertEqual(os.listdir(self.dir), [])
+
+    def test_purge(self):
+        Parser(cache=self.cache).parse(self.script)
+        self.cache.purge()
+        Parser(cache=self.cache).parse(self.script)
+
+        self.assertEqual(self.cache.stats['hits'], 0)
+        self.assertEqual(self.cache.stats['misses'], 2)
+
+    def test_corrupt_entry_reparsed(self):
+        Parser(cache=self.cache).parse(self.script)
+        path = self.cache.path(self.cache.key(None, self.script))
+        with open(path, 'wb') as corrupt:
+            corrupt.write(b'not a pickle')
+
+        forms = Parser(cache=self.cache).parse(self.script)
+        self.assertEqual(len(forms), 3)
+        self.assertEqual(self.cache.stats['errors'], 1)
+
+    def test_script_cached_only_when_asked(self):
+        script = os.path.join(self.dir, 'script.shb')
+        with open(script, 'w') as f:
+            f.write('a is a Promoter()\n')
+        entry = FormCache(directory=os.path.join(self.dir, 'forms')).path(
+            self.cache.key(script, 'a is a Promoter()\n'))
+
+        with unittest.mock.patch.dict(os.environ, SHORTBOL_CACHE_DIR=self.dir):
+            for cache_script in (False, True):
+                parse_from_file(script, serializer='nt', optpaths=['templates'],
+                                out=os.path.join(self.dir, 'out.nt'),
+                                no_validation=True, cache_script=cache_script)
+                self.assertEqual(os.path.exists(entry), cache_script)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+
+from rdfscript.parser import Parser
+from rdfscript.incremental import IncrementalParser, common_prefix
+from rdfscript.error import RDFScriptSyntax
+
+
+SCRIPT = '''@prefix eg = <http://eg/>
+@prefix eg
+
+T(x, y)
+(
+  eg.p = x
+  eg.q = "string ( with ) brackets"
+)
+
+a is a T(1, 2)
+b is a T(
+  a,
+  3)
+  (
+  eg.r = <http://eg/#frag>
+  )
+c = a.b
+d is a T(4, 5)
+'''
+
+
+class IncrementalParserTest(unittest.TestCase):
+
+    def setUp(self):
+        self.document = IncrementalParser(filename='edited.shb', text=SCRIPT)
+
+    def tearDown(self):
+        self.document = None
+
+    def assertParsedAs(self, forms, text):
+        expected = Parser(filename='edited.shb').parse(text)
+        self.assertEqual(forms, expected)
+        for (form, serial) in zip(forms, expected):
+            self.assertEqual(form.location, serial.location)
+            self.assertEqual(form.line, serial.line)
+
+    def test_initial_parse(self):
+        self.assertParsedAs(self.document.forms, SCRIPT)
+
+    def test_edit_inside_form(self):
+        before = self.document.forms
+        start = SCRIPT.index('1, 2')
+        forms = self.document.edit(start, start + 1, '10')
+
+        self.assertEqual(self.document.text, SCRIPT.replace('1, 2', '10, 2'))
+        self.assertParsedAs(forms, self.document.text)
+
+        (index, removed, added) = self.document.changed
+        self.assertLessEqual(removed, 3)
+        for (old, new) in zip(before[:index], forms[:index]):
+            self.assertIs(old, new)
+        for (old, new) in zip(before[index + removed:], forms[index + added:]):
+            self.assertIs(old, new)
+
+    def test_moved_forms_keep_identity(self):
+        last = self.document.forms[-1]
+        start = SCRIPT.index('a is a')
+        forms = self.document.edit(start, start, 'e = 1\n\n')
+
+        self.assertIs(forms[-1], last)
+        self.assertEqual(len(forms), len(self.document.forms))
+        self.assertParsedAs(forms, self.document.text)
+
+    def test_edit_joining_forms(self):
+        start = SCRIPT.index('\nd is a')
+        forms = self.document.edit(start, start + 1, '.')
+
+        self.assertParsedAs(forms, self.document.text)
+
+    def test_edit_spanning_forms(self):
+        start = SCRIPT.index('eg.q')
+        end = SCRIPT.index('c = a.b')
+        forms = self.document.edit(start, end, 'eg.q = 2\n)\n')
+
+        self.assertParsedAs(forms, self.document.text)
+
+    def test_comment_out_part_of_line(self):
+        text = 'a = 1\nb = 2 c = 3 d = 4\ne = 5\n'
+        document = IncrementalParser(filename='edited.shb', text=text)
+        forms = document.edit(6, 6, '#')
+
+        self.assertParsedAs(forms, document.text)
+        self.assertEqual(len(forms), 2)
+
+        forms = document.edit(6, 7, '')
+        self.assertParsedAs(forms, text)
+
+    def test_comment_out_line(self):
+        start = SCRIPT.index('c = a.b')
+        forms = self.document.edit(start, start, '# ')
+
+        self.assertParsedAs(forms, self.document.text)
+        self.assertEqual(len(forms), len(Parser().parse(SCRIPT)) - 1)
+
+    def test_string_opened_on_line(self):
+        text = 'a = 1\nb = 2 c = 3 d = "x"\ne = 5\n'
+        document = IncrementalParser(filename='edited.shb', text=text)
+        forms = document.edit(6, 6, 'f = "')
+
+        self.assertParsedAs(forms, document.text)
+
+    def test_edit_closing_earlier_uri(self):
+        text = 'a = <x\nb = 1\nc = <http://y>\nd = 2\n'
+        document = IncrementalParser(filename='edited.shb', text=text)
+        start = text.index('<http')
+        forms = document.edit(start, start + 1, '')
+
+        self.assertParsedAs(forms, document.text)
+        self.assertEqual(len(forms), 2)
+
+    def test_update(self):
+        text = SCRIPT.replace('eg.r', 'eg.s')
+        forms = self.document.update(text)
+
+        self.assertEqual(self.document.text, text)
+        self.assertParsedAs(forms, text)
+        self.assertEqual(self.document.changed[1:], (3, 3))
+
+    def test_syntax_error_then_fix(self):
+        start = SCRIPT.index('c = a.b')
+        with self.assertRaises(RDFScriptSyntax):
+            self.document.edit(start, start, '= ')
+
+        forms = self.document.edit(start, start + 2, '')
+        self.assertEqual(self.document.text, SCRIPT)
+        self.assertParsedAs(forms, SCRIPT)
+
+    def test_common_prefix(self):
+        self.assertEqual(common_prefix('abcdef', 'abcxef'), 3)
+        self.assertEqual(common_prefix('abc', 'abc'), 3)
+        self.assertEqual(common_prefix('', 'abc'), 0)
@@ -0,0 +1,51 @@
+import unittest
+
+from rdfscript.parser import Parser
+from rdfscript.env import Env
+from rdfscript.error import TemplateNotFound
+from rdfscript.parallel import ParallelEvaluator, batches
+
+TEMPLATES = '''@prefix eg = <http://eg.org/>
+@prefix eg
+t(x, y)(eg.kind = x
+eg.size = y)
+'''
+
+
+def instances(start, end):
+    return '\n'.join(f'i{k} is a t(k{k}, {k})' for k in range(start, end))
+
+
+class ParallelEvaluatorTest(unittest.TestCase):
+
+    def interpret(self, script, evaluator=None):
+        env = Env(serializer='nt', evaluator=evaluator)
+        env.interpret(Parser().parse(TEMPLATES))
+        return (env, env.interpret(Parser().parse(script)))
+
+    def test_batches(self):
+        forms = Parser().parse(TEMPLATES + instances(0, 5) + '\nz = 1\n' + instances(5, 7))
+        self.assertEqual([len(batch) for batch in batches(forms, 3)],
+                         [1, 1, 1, 3, 2, 1, 2])
+
+    def test_same_graph_as_serial(self):
+        script = instances(0, 40) + '\nz = 1\n' + instances(40, 60)
+        (serial, serial_result) = self.interpret(script)
+
+        evaluator = ParallelEvaluator(jobs=2, min_batch=8)
+        (parallel, parallel_result) = self.interpret(script, evaluator)
+
+        self.assertEqual(sorted(str(parallel).splitlines()),
+                         sorted(str(serial).splitlines()))
+        self.assertEqual(parallel_result, serial_result)
+        self.assertEqual(evaluator.stats, {'forms': 64, 'parallel': 60})
+
+    def test_failure_reported_in_order(self):
+        script = instances(0, 10) + '\nbad is a missing()\n' + instances(10, 20)
+        evaluator = ParallelEvaluator(jobs=2, min_batch=8)
+        env = Env(serializer='nt', evaluator=evaluator)
+        env.interpret(Parser().parse(TEMPLATES))
+
+        with self.assertRaises(TemplateNotFound):
+            env.interpret(Parser().parse(script))
+        self.assertEqual(len(env._rdf.triples), 20)
@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from rdfscript import parser as parser_module
+from rdfscript.parser import Parser, prebuilt, GRAMMAR_VERSION, cache_dir, purge_tables
+from rdfscript.core import Assignment, Identifier, Name, Value
+
+
+class ParserFactoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = tempfile.mkdtemp()
+        self.old_cache = os.environ.get('SHORTBOL_CACHE_DIR')
+        os.environ['SHORTBOL_CACHE_DIR'] = self.cache
+        self.prebuilt = dict(parser_module._prebuilt)
+
+    def tearDown(self):
+        parser_module._prebuilt.clear()
+        parser_module._prebuilt.update(self.prebuilt)
+        if self.old_cache is None:
+            del os.environ['SHORTBOL_CACHE_DIR']
+        else:
+            os.environ['SHORTBOL_CACHE_DIR'] = self.old_cache
+        shutil.rmtree(self.cache, ignore_errors=True)
+
+    def rebuild(self):
+        parser_module._prebuilt.clear()
+        return prebuilt()
+
+    def test_tables_shared(self):
+        first = Parser(filename='first.shb')
+        second = Parser(filename='second.shb')
+
+        (lexer, parser) = prebuilt()
+        self.assertIs(first.parser.action, parser.action)
+        self.assertIs(second.parser.action, parser.action)
+        self.assertIs(first.scanner.lexstatere, lexer.lexstatere)
+
+    def test_parse_state_not_shared(self):
+        first = Parser(filename='first.shb')
+        second = Parser(filename='second.shb')
+
+        self.assertIsNot(first.parser, second.parser)
+        self.assertIsNot(first.scanner, second.scanner)
+
+        forms = first.parse('a = 1\n\n\nb = 2')
+        self.assertEqual(forms[1].location.line, 4)
+        self.assertEqual(forms[1].location.filename, 'first.shb')
+
+        forms = second.parse('c = 3')
+        self.assertEqual(forms[0].location.line, 1)
+        self.assertEqual(forms[0].location.filename, 'second.shb')
+
+    def test_parse_result(self):
+        forms = Parser().parse('a = 1')
+
+        self.assertEqual(forms, [Assignment(Identifier(Name('a')), Value(1))])
+
+    def test_cache_keyed_by_grammar(self):
+        self.assertEqual(cache_dir().name, GRAMMAR_VERSION[:16])
+
+    def test_tables_written_to_cache(self):
+        self.rebuild()
+        self.assertEqual(sorted(os.listdir(cache_dir())),
+                         ['parsetab.pickle', 'shortbol_lextab.py'])
+        self.assertEqual(os.listdir(cache_dir().parent), [cache_dir().name])
+
+    def test_truncated_tables_rebuilt(self):
+        self.rebuild()
+        for name in ('parsetab.pickle', 'shortbol_lextab.py'):
+            path = cache_dir() / name
+            path.write_bytes(path.read_bytes()[:100])
+
+            (_, parser) = self.rebuild()
+            self.assertEqual(Parser().parse('a = 1'),
+                             [Assignment(Identifier(Name('a')), Value(1))])
+            self.assertIsNotNone(parser_module._load_tables(cache_dir()))
+
+    def test_purge_tables(self):
+        self.rebuild()
+        purge_tables()
+        self.assertFalse(cache_dir().exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
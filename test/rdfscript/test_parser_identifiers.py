@@ -69,3 +69,20 @@ class TestIdentifierParsing(unittest.TestCase):
         expected = [Identifier(Name('p'), Self())]
         actually = self.parser.parse(script)
         self.assertCountEqual(expected, actually)
+
+    def test_repeated_identifiers_share_strings(self):
+        script = 'sbol.role = <http://a/>\nsbol.role = <http://a/>'
+        [first, second] = self.parser.parse(script)
+
+        self.assertIs(first.name.parts[0].name, second.name.parts[0].name)
+        self.assertIs(first.name.parts[1].name, second.name.parts[1].name)
+        self.assertIs(first.value.parts[0].uri, second.value.parts[0].uri)
+        self.assertIsNot(first.name, second.name)
+        self.assertNotEqual(first.name.parts[0].location,
+                            second.name.parts[0].location)
+
+    def test_nodes_have_no_dict(self):
+        [form] = self.parser.parse('p.n = <http://a/>')
+
+        for node in [form, form.name, form.name.parts[0], form.value]:
+            self.assertFalse(hasattr(node, '__dict__'))
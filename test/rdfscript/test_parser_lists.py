@@ -0,0 +1,57 @@
+import unittest
+
+from rdfscript.parser import Parser
+
+from rdfscript.core import Name, Value, Identifier, Assignment
+from rdfscript.template import Template, Property
+
+
+class ParserListTest(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = Parser()
+        self.maxDiff = None
+
+    def tearDown(self):
+        None
+
+    def test_many_forms_in_order(self):
+        n = 5000
+        script = '\n'.join([f'a{i} = {i}' for i in range(n)])
+        forms = self.parser.parse(script)
+
+        self.assertEqual(len(forms), n)
+        self.assertEqual(forms[0], Assignment(Identifier(Name('a0')), Value(0)))
+        self.assertEqual(forms[-1], Assignment(Identifier(Name(f'a{n - 1}')), Value(n - 1)))
+        self.assertEqual(forms[-1].location.line, n)
+
+    def test_long_argument_list_in_order(self):
+        n = 1000
+        args = ', '.join([str(i) for i in range(n)])
+        forms = self.parser.parse(f'e is a a({args})')
+
+        self.assertEqual([arg.value for arg in forms[0].args[1:]],
+                         [Value(i) for i in range(n)])
+
+    def test_long_parameter_and_body_lists_in_order(self):
+        n = 500
+        params = ', '.join([f'p{i}' for i in range(n)])
+        body = '\n'.join([f'x{i} = p{i}' for i in range(n)])
+        forms = self.parser.parse(f't({params})({body})')
+
+        template = forms[0]
+        self.assertIsInstance(template, Template)
+        self.assertEqual([p.name for p in template.parameters[1:]],
+                         [f'p{i}' for i in range(n)])
+        self.assertEqual(template.body[-1],
+                         Property(Identifier(Name(f'x{n - 1}')),
+                                  Identifier(Name(f'p{n - 1}'))))
+
+    def test_dotted_identifier_in_order(self):
+        forms = self.parser.parse('a.b.c.d')
+
+        self.assertEqual(forms[0], Identifier(Name('a'), Name('b'), Name('c'), Name('d')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import tempfile
+import shutil
+import pathlib
+
+from rdfscript.parser import Parser
+from rdfscript.importer import Importer
+from rdfscript.prefetch import ImportPrefetcher, import_targets
+
+
+class ImportPrefetcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = pathlib.Path(tempfile.mkdtemp())
+        (self.dir / 'a.shb').write_text('use <b>\nuse <c>\nx = 1')
+        (self.dir / 'b.shb').write_text('use <d>\ny = 2')
+        (self.dir / 'c.shb').write_text('t(v)(p = v)')
+        (self.dir / 'd.shb').write_text('z = "d"')
+        self.importer = Importer([str(self.dir)])
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_import_targets(self):
+        forms = Parser().parse('use <a>\nuse b.c\nx = 1\nuse <d>')
+        self.assertEqual(import_targets(forms), ['a', 'd'])
+
+    def test_transitive_imports_prefetched(self):
+        prefetcher = ImportPrefetcher(jobs=2)
+        prefetcher.prefetch(Parser().parse('use <a>'), self.importer)
+
+        # a alone is under the threshold, so only its imports are fetched
+        self.assertEqual(prefetcher.stats['prefetched'], 0)
+
+        forms = Parser().parse((self.dir / 'a.shb').read_text())
+        prefetcher.prefetch(forms, self.importer)
+        self.assertEqual(prefetcher.stats['prefetched'], 3)
+
+        for name in ['b', 'c', 'd']:
+            text = (self.dir / name).with_suffix('.shb').read_text()
+            expected = Parser(filename=name).parse(text)
+            self.assertEqual(prefetcher.take(name, text), expected)
+        self.assertEqual(prefetcher.stats['used'], 3)
+
+    def test_take_requires_same_text(self):
+        prefetcher = ImportPrefetcher(jobs=2)
+        forms = Parser().parse((self.dir / 'a.shb').read_text())
+        prefetcher.prefetch(forms, self.importer)
+
+        self.assertIsNone(prefetcher.take('c', 't(v)(p = v, q = v)'))
+        self.assertIsNone(prefetcher.take('a', 'x = 1'))
+        self.assertEqual(prefetcher.stats['used'], 0)
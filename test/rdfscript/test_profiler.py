@@ -0,0 +1,71 @@
+import unittest
+
+from rdfscript.parser import Parser
+from rdfscript.env import Env
+from rdfscript.profiler import Profiler
+
+SCRIPT = '''@prefix eg = <http://eg.org/>
+@prefix eg
+t(x, y)(eg.kind = x
+eg.size = y)
+a is a t(k, 1)
+b is a t(k, 2)
+'''
+
+
+class Ticks:
+    """A clock that advances by one on every reading."""
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        self.now += 1
+        return self.now
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def test_self_and_cumulative_time(self):
+        profiler = Profiler(clock=Ticks())
+        with profiler.frame('import', 'lib'):
+            with profiler.frame('parse', 'lib'):
+                pass
+            with profiler.frame('template', 'eg.t'):
+                pass
+
+        report = profiler.report()
+        self.assertEqual(report['total'], 5)
+        self.assertEqual(report['imports'],
+                         {'lib': {'count': 1, 'parse': 1, 'evaluate': 4}})
+        self.assertEqual(report['templates']['eg.t']['self'], 1)
+        self.assertEqual(profiler.collapsed(),
+                         'import:lib 3000000\n'
+                         'import:lib;parse:lib 1000000\n'
+                         'import:lib;template:eg.t 1000000\n')
+
+    def test_recursive_frame_counted_once(self):
+        profiler = Profiler(clock=Ticks())
+        with profiler.frame('template', 't'):
+            with profiler.frame('template', 't'):
+                pass
+
+        entry = profiler.report()['templates']['t']
+        self.assertEqual(entry['count'], 2)
+        self.assertEqual(entry['cumulative'], 3)
+        self.assertEqual(entry['self'], 3)
+
+    def test_labels_have_no_separators(self):
+        profiler = Profiler(clock=Ticks())
+        with profiler.frame('extension', 'a b;c'):
+            pass
+        self.assertEqual(profiler.collapsed(), 'extension:a_b_c 1000000\n')
+
+    def test_expansions_profiled_by_template(self):
+        env = Env(serializer='nt', profiler=Profiler())
+        env.interpret(Parser().parse(SCRIPT))
+
+        templates = env.profiler.report()['templates']
+        self.assertEqual(list(templates), ['http://eg.org/t'])
+        self.assertEqual(templates['http://eg.org/t']['count'], 2)
+        self.assertEqual(templates['http://eg.org/t']['triples'], 4)
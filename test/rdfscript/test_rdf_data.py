@@ -3,7 +3,8 @@ import unittest
 import rdflib
 
 from rdfscript.core import Uri, Value
-from rdfscript.rdf_data import RDFData
+from rdfscript.rdf_data import RDFData, MemoryData, EncodedData
+from rdfscript.error import PrefixError
 
 class RDFDataTest(unittest.TestCase):
 
@@ -88,3 +89,122 @@ class RDFDataTest(unittest.TestCase):
 
 
 
+
+    def test_rebound_prefix_follows_graph(self):
+
+        data = RDFData()
+
+        data.bind_prefix('p', Uri('http://one.org/#', None))
+        data.bind_prefix('q', Uri('http://one.org/#', None))
+        data.bind_prefix('p', Uri('http://two.org/#', None))
+
+        for (prefix, namespace) in data._g.namespaces():
+            self.assertEqual(data.uri_for_prefix(prefix), Uri(namespace.toPython(), None))
+
+        with self.assertRaises(PrefixError):
+            data.uri_for_prefix('missing')
+        with self.assertRaises(PrefixError):
+            data.prefix_for_uri(Uri('http://missing.org/#', None))
+
+    def test_split_uri(self):
+
+        data = RDFData()
+
+        data.bind_prefix('a', Uri('http://a.org/', None))
+        data.bind_prefix('ab', Uri('http://a.org/b#', None))
+
+        self.assertEqual(data.split_uri(Uri('http://a.org/x', None)), ('a', 'x'))
+        self.assertEqual(data.split_uri(Uri('http://a.org/b#y', None)), ('ab', 'y'))
+        self.assertEqual(data.split_uri(Uri('http://a.org/b', None)), ('a', 'b'))
+        self.assertEqual(data.longest_namespace(Uri('http://a.org/b#', None)), 'http://a.org/b#')
+        self.assertIsNone(data.split_uri(Uri('http://c.org/', None)))
+
+    def test_memory_data_binds_like_rdflib(self):
+
+        data = RDFData()
+        memory = MemoryData()
+
+        bindings = [('p', 'http://one.org/#'),
+                    ('q', 'http://one.org/#'),
+                    ('p', 'http://two.org/#'),
+                    ('p', 'http://three.org/#'),
+                    ('p', 'http://two.org/#'),
+                    ('rdf', 'http://not-rdf.org/')]
+        for (prefix, namespace) in bindings:
+            data.bind_prefix(prefix, Uri(namespace, None))
+            memory.bind_prefix(prefix, Uri(namespace, None))
+
+        self.assertEqual(data.namespaces(), memory.namespaces())
+        for (prefix, namespace) in data.namespaces():
+            self.assertEqual(data.uri_for_prefix(prefix), memory.uri_for_prefix(prefix))
+
+    def test_memory_data_triples(self):
+
+        data = MemoryData()
+        (s, p, o) = (Uri('http://s.org/', None), Uri('http://p.org/', None), Value(1, None))
+
+        data.add(s, p, o)
+        data.add(s, p, o)
+        data.add(s, p, Value(1.0, None))
+        self.assertEqual(data.triples, [(s, p, o), (s, p, Value(1.0, None))])
+
+        data.add(s, p, Value(2, None), unique=True)
+        self.assertEqual(data.triples, [(s, p, Value(2, None))])
+
+        data.remove(s, p, Value(2, None))
+        self.assertEqual(data.triples, [])
+
+    def test_encoded_data_triples(self):
+
+        data = EncodedData()
+        (s, p, o) = (Uri('http://s.org/', None), Uri('http://p.org/', None), Value(1, None))
+
+        data.add(s, p, o)
+        data.add(s, p, Value(1, None))
+        data.add(s, p, Value(1.0, None))
+        data.add(s, p, Value(True, None))
+        self.assertEqual(data.triples, [(s, p, o), (s, p, Value(1.0, None)), (s, p, Value(True, None))])
+
+        data.add(s, p, Value(2, None), unique=True)
+        self.assertEqual(data.triples, [(s, p, Value(2, None))])
+
+        data.remove(s, p, Value(2, None))
+        data.remove(s, p, Value('never added', None))
+        self.assertEqual(data.triples, [])
+
+    def test_encoded_data_serialises_like_rdflib(self):
+
+        data = RDFData(serializer='turtle')
+        encoded = EncodedData(serializer='turtle')
+        triples = [(Uri('http://s.org/#a', None), Uri('http://p.org/#p', None), Value('x', None)),
+                   (Uri('http://s.org/#a', None), Uri('http://p.org/#q', None), Uri('http://s.org/#b', None)),
+                   (Uri('http://s.org/#b', None), Uri('http://p.org/#p', None), Value(3, None))]
+        for store in (data, encoded):
+            store.bind_prefix('s', Uri('http://s.org/#', None))
+            for (s, p, o) in triples:
+                store.add(s, p, o)
+            store.remove(*triples[1])
+
+        self.assertCountEqual(encoded.triples, data.triples)
+        self.assertEqual(encoded.serialise(), data.serialise())
+        self.assertEqual(len(encoded._g), 0)
+
+    def test_add_triples_as_add(self):
+
+        s = Uri('http://s.org/', None)
+        p = Uri('http://p.org/', None)
+        triples = [(s, p, Value(1, None)),
+                   (s, p, Value(True, None)),
+                   (s, p, Value(1.0, None)),
+                   (s, p, Value(1, None)),
+                   (s, p, Uri('http://o.org/', None)),
+                   (Uri('http://o.org/', None), p, Value('x', None))]
+        for store in (RDFData, MemoryData, EncodedData):
+            one_at_a_time = store()
+            for (a, b, c) in triples:
+                one_at_a_time.add(a, b, c)
+            batched = store()
+            batched.add_triples(triples[:3])
+            batched.add_triples(iter(triples[3:]))
+            self.assertCountEqual(batched.triples, one_at_a_time.triples)
+            self.assertEqual(len(batched.triples), 5)
@@ -0,0 +1,83 @@
+import tempfile
+import shutil
+import unittest
+
+from rdfscript.parser import Parser
+from rdfscript.env import Env
+from rdfscript.recompile import IncrementalEvaluator, fingerprint
+
+SCRIPT = '''@prefix eg = <http://eg.org/>
+@prefix eg
+t(x, y)(eg.kind = x
+eg.size = y)
+u(x)(eg.label = x)
+size = 1
+a is a t(k, size)
+b is a t(k, 2)
+c is a u(name)
+'''
+
+
+class IncrementalEvaluatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def compile(self, script, incremental=True):
+        evaluator = None
+        if incremental:
+            evaluator = IncrementalEvaluator('script.shb', directory=self.dir)
+        env = Env(serializer='nt', evaluator=evaluator)
+        env.interpret(Parser().parse(script))
+        if incremental:
+            evaluator.save()
+        return (env, evaluator)
+
+    def graph(self, env):
+        return sorted(str(env).splitlines())
+
+    def test_fingerprint_ignores_location(self):
+        first = Parser().parse('a is a t(k, 1)')[0]
+        second = Parser().parse('\n\n  a is a t(k, 1)')[0]
+        third = Parser().parse('a is a t(k, 2)')[0]
+        self.assertEqual(fingerprint(first), fingerprint(second))
+        self.assertNotEqual(fingerprint(first), fingerprint(third))
+
+    def test_unchanged_script_reused(self):
+        (_, first) = self.compile(SCRIPT)
+        self.assertEqual(first.stats, {'reused': 0, 'evaluated': 3})
+
+        (env, second) = self.compile(SCRIPT)
+        self.assertEqual(second.stats, {'reused': 3, 'evaluated': 0})
+        self.assertEqual(self.graph(env), self.graph(self.compile(SCRIPT, False)[0]))
+
+    def test_changed_symbol_reevaluates_readers(self):
+        self.compile(SCRIPT)
+        script = SCRIPT.replace('size = 1', 'size = 5')
+        (env, evaluator) = self.compile(script)
+        self.assertEqual(evaluator.stats, {'reused': 2, 'evaluated': 1})
+        self.assertEqual(self.graph(env), self.graph(self.compile(script, False)[0]))
+
+    def test_changed_template_reevaluates_instances(self):
+        self.compile(SCRIPT)
+        script = SCRIPT.replace('eg.label = x', 'eg.title = x')
+        (env, evaluator) = self.compile(script)
+        self.assertEqual(evaluator.stats, {'reused': 2, 'evaluated': 1})
+        self.assertEqual(self.graph(env), self.graph(self.compile(script, False)[0]))
+
+    def test_extensions_not_reused(self):
+        script = SCRIPT + 'v(x)(eg.label = x\n@extension AtLeastOne(eg.label))\nd is a v(size)\n'
+        self.compile(script)
+        (env, evaluator) = self.compile(script)
+        self.assertEqual(evaluator.stats, {'reused': 3, 'evaluated': 1})
+        self.assertEqual(self.graph(env), self.graph(self.compile(script, False)[0]))
+
+    def test_changed_prefix_reevaluates_all(self):
+        self.compile(SCRIPT)
+        script = SCRIPT.replace('<http://eg.org/>', '<http://other.org/>')
+        (env, evaluator) = self.compile(script)
+        self.assertEqual(evaluator.stats, {'reused': 0, 'evaluated': 3})
+        self.assertEqual(self.graph(env), self.graph(self.compile(script, False)[0]))
@@ -0,0 +1,105 @@
+import unittest
+import tempfile
+import shutil
+import os
+import pathlib
+
+from rdfscript.env import Env
+from rdfscript.core import Uri, Value
+from rdfscript.snapshot import LibrarySnapshots
+
+
+class LibrarySnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = tempfile.mkdtemp()
+        self.lib = tempfile.mkdtemp()
+        self.write('mylib', 'use <mylib/inner>\nalias = lib.thing\n')
+        os.mkdir(os.path.join(self.lib, 'mylib'))
+        self.write('mylib/inner',
+                   '@prefix lib = <http://lib.eg/>\n@prefix lib\n'
+                   'thing = 1\nT(x)(lib.p = x)\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.cache, ignore_errors=True)
+        shutil.rmtree(self.lib, ignore_errors=True)
+
+    def write(self, name, text):
+        with open(os.path.join(self.lib, name + '.shb'), 'w') as out:
+            out.write(text)
+
+    def make_env(self, snapshots):
+        env = Env(paths=[self.lib], snapshots=snapshots)
+        env.bind_prefix('user', Uri('http://user.eg/'))
+        env.prefix = 'user'
+        return env
+
+    def test_restore_matches_import(self):
+        snapshots = LibrarySnapshots(directory=self.cache, libraries=['mylib'])
+
+        expected = self.make_env(None)
+        self.assertTrue(expected.eval_import(Uri('mylib')))
+
+        for builds, hits in [(1, 0), (1, 1)]:
+            env = self.make_env(snapshots)
+            self.assertTrue(env.eval_import(Uri('mylib')))
+            self.assertEqual(snapshots.stats, {'hits': hits, 'builds': builds})
+
+            self.assertEqual(env._symbol_table, expected._symbol_table)
+            self.assertEqual(env._template_table, expected._template_table)
+            self.assertEqual(env.lookup(Uri('http://user.eg/alias')), Value(1))
+            self.assertEqual(env.uri_for_prefix('lib'), Uri('http://lib.eg/'))
+            self.assertEqual(env.prefix, 'user')
+
+    def test_rebuilt_when_library_changes(self):
+        snapshots = LibrarySnapshots(directory=self.cache, libraries=['mylib'])
+        self.make_env(snapshots).eval_import(Uri('mylib'))
+
+        inner = pathlib.Path(self.lib) / 'mylib' / 'inner.shb'
+        stat = inner.stat()
+        self.write('mylib/inner',
+                   '@prefix lib = <http://lib.eg/>\n@prefix lib\n'
+                   'thing = 22\nT(x)(lib.p = x)\n')
+        os.utime(inner, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        env = self.make_env(snapshots)
+        env.eval_import(Uri('mylib'))
+        self.assertEqual(snapshots.stats['builds'], 2)
+        self.assertEqual(env.lookup(Uri('http://user.eg/alias')), Value(22))
+
+    def test_keyed_by_import_path(self):
+        snapshots = LibrarySnapshots(directory=self.cache, libraries=['mylib'])
+        self.make_env(snapshots).eval_import(Uri('mylib'))
+
+        # an earlier directory on the path shadows the inner file only
+        shadow = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, shadow, ignore_errors=True)
+        os.mkdir(os.path.join(shadow, 'mylib'))
+        with open(os.path.join(shadow, 'mylib', 'inner.shb'), 'w') as out:
+            out.write('@prefix lib = <http://lib.eg/>\n@prefix lib\nthing = 3\n')
+
+        env = Env(paths=[shadow, self.lib], snapshots=snapshots)
+        env.bind_prefix('user', Uri('http://user.eg/'))
+        env.prefix = 'user'
+        env.eval_import(Uri('mylib'))
+        self.assertEqual(snapshots.stats['builds'], 2)
+        self.assertEqual(env.lookup(Uri('http://user.eg/alias')), Value(3))
+
+    def test_only_listed_libraries(self):
+        snapshots = LibrarySnapshots(directory=self.cache, libraries=['other'])
+        env = self.make_env(snapshots)
+
+        self.assertTrue(env.eval_import(Uri('mylib')))
+        self.assertEqual(snapshots.stats, {'hits': 0, 'builds': 0})
+
+    def test_disabled(self):
+        snapshots = LibrarySnapshots(directory=self.cache, enabled=False, libraries=['mylib'])
+        env = self.make_env(snapshots)
+
+        self.assertTrue(env.eval_import(Uri('mylib')))
+        self.assertEqual(snapshots.stats, {'hits': 0, 'builds': 0})
+        self.assertFalse(os.path.exists(os.path.join(self.cache)) and os.listdir(self.cache))
+
+
+if __name__ == '__main__':
+    unittest.main()
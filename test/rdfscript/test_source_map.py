@@ -0,0 +1,66 @@
+import unittest
+
+from rdfscript.parser import Parser
+from rdfscript.source import SourceMap, Location
+from rdfscript.error import RDFScriptSyntax
+
+
+class SourceMapTest(unittest.TestCase):
+
+    def setUp(self):
+        None
+
+    def tearDown(self):
+        None
+
+    def test_lines_and_columns(self):
+        source = SourceMap('map.shb', 'ab\ncde\n\nf')
+
+        self.assertEqual([source.line(o) for o in range(10)],
+                         [1, 1, 1, 2, 2, 2, 2, 3, 4, 4])
+        self.assertEqual([source.column(o) for o in range(10)],
+                         [0, 1, 2, 0, 1, 2, 3, 0, 0, 1])
+
+    def test_extend(self):
+        whole = SourceMap('map.shb', 'ab\ncde\n\nf\ng')
+        pieces = SourceMap('map.shb')
+        for piece in ['a', 'b\nc', 'de\n', '\nf\n', 'g']:
+            pieces.extend(piece)
+
+        self.assertEqual([whole.line(o) for o in range(12)],
+                         [pieces.line(o) for o in range(12)])
+
+    def test_default_filename(self):
+        self.assertEqual(SourceMap().filename, 'REPL')
+
+    def test_location(self):
+        source = SourceMap('map.shb', 'ab\ncde')
+        location = source.location(5)
+
+        self.assertEqual(location, Location(source, 5))
+        self.assertEqual(location.line, 2)
+        self.assertEqual(location.col, 5)
+        self.assertEqual(location.col_on_line, 2)
+        self.assertEqual(location.filename, 'map.shb')
+        self.assertEqual(repr(location), '2, 5 in map.shb')
+
+    def test_nodes_share_source(self):
+        forms = Parser(filename='map.shb').parse('a = 1   \n  \nb = c.d')
+
+        self.assertFalse(hasattr(forms[0], '_location'))
+        self.assertIs(forms[0]._source, forms[1].value._source)
+        self.assertEqual(forms[1].location.line, 3)
+        self.assertEqual(forms[1].line, 3)
+        self.assertEqual(forms[1].value.location.col_on_line, 4)
+        self.assertEqual(forms[1].file, 'map.shb')
+
+    def test_syntax_error_location(self):
+        with self.assertRaises(RDFScriptSyntax) as error:
+            Parser(filename='map.shb').parse('a = 1\n\n  = 2')
+
+        self.assertEqual(error.exception.location.line, 3)
+        self.assertEqual(error.exception.location.col_on_line, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
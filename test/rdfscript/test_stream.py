@@ -0,0 +1,108 @@
+import unittest
+import io
+import os
+import tempfile
+
+from rdfscript.parser import Parser
+from rdfscript.stream import FormStream, form_boundaries, stream_lexer
+from rdfscript.error import RDFScriptSyntax, MisplacedPragma
+from run import pre_process, stream_pre_process
+
+
+SCRIPT = '''@prefix eg = <http://eg/>
+@prefix eg
+use <sbol_2>
+
+# a comment ( with brackets
+T(x, y)
+(
+  eg.p = x
+  eg.q = "string ( with ) brackets"
+)
+
+a is a T(1, 2)
+b is a T(
+  a,
+  3)
+  (
+  eg.r = <http://eg/#frag>
+  )
+c = a.b
+@extension Ext(a)
+d is a T(4, 5)
+'''
+
+
+class FormStreamTest(unittest.TestCase):
+
+    def setUp(self):
+        self.serial = Parser(filename='stream.shb').parse(SCRIPT)
+
+    def tearDown(self):
+        None
+
+    def assert_same_forms(self, streamed):
+        self.assertEqual(streamed, self.serial)
+        self.assertEqual([(f.location.line, f.location.col) for f in streamed],
+                         [(f.location.line, f.location.col) for f in self.serial])
+
+    def test_boundaries(self):
+        lexer = stream_lexer()
+        lexer.input('a = b\nc is a T()\n(\nx = y\n)\nd')
+        tokens = list(iter(lexer.token, None))
+
+        self.assertEqual([tokens[i].value for i in form_boundaries(tokens)],
+                         ['c', 'd'])
+
+    def test_matches_serial_parse(self):
+        for block_size in [1, 16, 1 << 16]:
+            stream = FormStream(io.StringIO(SCRIPT),
+                                filename='stream.shb',
+                                block_size=block_size)
+            self.assert_same_forms(list(stream))
+
+    def test_mmap(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.shb', delete=False) as out:
+            out.write(SCRIPT)
+        try:
+            self.serial = Parser(filename=out.name).parse(SCRIPT)
+            stream = FormStream.from_path(out.name, use_mmap=True, block_size=16)
+            self.assert_same_forms(list(stream))
+        finally:
+            os.remove(out.name)
+
+    def test_lazy(self):
+        stream = iter(FormStream(io.StringIO(SCRIPT), block_size=1))
+        first = next(stream)
+
+        self.assertEqual(first, self.serial[0])
+
+    def test_syntax_error_location(self):
+        stream = FormStream(io.StringIO('a = 1\nb = 2\nc = = 3\n'), block_size=1)
+
+        with self.assertRaises(RDFScriptSyntax) as error:
+            list(stream)
+        self.assertEqual(error.exception.location.line, 3)
+        self.assertEqual(error.exception.location.col, 16)
+
+    def test_stream_pre_process_as_pre_process(self):
+        for version in ('sbol_2', 'sbol_3'):
+            self.assertEqual(list(stream_pre_process(iter(self.serial), version)),
+                             pre_process(list(self.serial), version))
+
+    def test_later_prefix_rejected(self):
+        forms = Parser().parse('a = 1\n@prefix eg = <http://eg/>\nb = 2\n')
+
+        with self.assertRaises(MisplacedPragma) as error:
+            list(stream_pre_process(iter(forms), 'sbol_2'))
+        self.assertEqual(error.exception.location.line, 2)
+
+        # the default prefix was already set, so a later one is fine
+        forms = Parser().parse('@prefix eg = <http://eg/>\na = 1\n'
+                               '@prefix f = <http://f/>\n')
+        self.assertEqual(list(stream_pre_process(iter(forms), 'sbol_2')),
+                         pre_process(list(forms), 'sbol_2'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+
+from rdfscript.core import Name, Value, Uri, Self, Parameter, Identifier, Argument
+from rdfscript.env import Env
+from rdfscript.parser import Parser
+from rdfscript.plan import compile_term, marshal_triple, GENERIC
+
+
+class SubstitutionPlanTest(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = Parser()
+        self.env = Env()
+        self.env.interpret(self.parser.parse(
+            '''t(x, y)
+            (
+              <http://eg/p> = x
+              <http://eg/q> = y.z
+              <http://eg/r> = <http://eg/fixed>
+              <http://eg/s> = 5
+            )'''))
+        self.uri = Identifier(Name('t')).evaluate(self.env)
+
+    def tearDown(self):
+        None
+
+    def expected(self, expansion):
+        triples = self.env.lookup_template(self.uri)
+        return [marshal_triple(triple, expansion.args) for triple in triples]
+
+    def test_compile_term(self):
+        self.assertIsNone(compile_term(Uri('http://eg/')))
+        self.assertIsNone(compile_term(Value(1)))
+        self.assertIsNone(compile_term(Identifier(Uri('http://eg/'), Name('a'))))
+        self.assertEqual(compile_term(Identifier(Self(), Parameter('x', 0), Name('b'))),
+                         ((1, 0), (0, -1)))
+        self.assertEqual(compile_term(Identifier(Identifier(Name('a')), Parameter('x', 0))),
+                         GENERIC)
+
+    def test_plan_compiled_on_definition(self):
+        plan = self.env.lookup_plan(self.uri)
+        self.assertIs(plan.triples, self.env._template_table[self.uri])
+        self.assertIs(self.env.lookup_plan(self.uri), plan)
+
+    def test_plan_recompiled_when_table_replaced(self):
+        plan = self.env.lookup_plan(self.uri)
+        self.env._template_table[self.uri] = list(plan.triples[:1])
+
+        self.assertEqual(len(self.env.lookup_plan(self.uri).triples), 1)
+
+    def test_expand_matches_marshal(self):
+        for args in ['a, b', '1, "s"', 'a.b, <http://eg/o>', 'a']:
+            expansion = self.parser.parse(f'e is a t({args})')[0]
+            plan = self.env.lookup_plan(self.uri)
+            self.assertEqual(plan.expand(expansion.args), self.expected(expansion))
+
+    def test_constant_triples_shared(self):
+        expansion = self.parser.parse('e is a t(a, b)')[0]
+        plan = self.env.lookup_plan(self.uri)
+        triples = plan.expand(expansion.args)
+
+        constants = [t for t in plan.triples if isinstance(t[0], Uri)]
+        for triple in constants:
+            self.assertIn(triple, triples)
+        self.assertIs(triples[2][2], plan.triples[2][2])
+
+    def test_parameter_arguments_marshalled(self):
+        args = [Argument(Identifier(Name('e')), -1),
+                Argument(Identifier(Parameter('p', 1)), 0),
+                Argument(Identifier(Name('b')), 1)]
+        plan = self.env.lookup_plan(self.uri)
+        triples = self.env.lookup_template(self.uri)
+
+        self.assertEqual(plan.expand(args),
+                         [marshal_triple(triple, args) for triple in triples])
+
+    def test_evaluate_unchanged(self):
+        forms = self.parser.parse('e is a t(a, b.c)')
+        forms[0].evaluate(self.env)
+
+        triples = self.env._rdf.triples
+        self.assertEqual(len(triples), 4)
+        self.assertIn((Identifier(Name('e')).evaluate(self.env),
+                       Uri('http://eg/r'),
+                       Uri('http://eg/fixed')), triples)
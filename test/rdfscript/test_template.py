@@ -684,3 +684,32 @@ class TemplateClassTest(unittest.TestCase):
         expect = [a, a, b, a, a, b, c]
 
         self.assertEqual(expect, v.as_triples(self.env))
+
+    def test_redefined_base_reflattens_derived(self):
+        forms = self.parser.parse('s()(a=123)' +
+                                  't()(s() b=456)' +
+                                  'u()(t() c=789)' +
+                                  'w()(d=0)')
+        self.env.interpret(forms)
+        table = self.env._template_table
+        w = table[Identifier(Name('w')).evaluate(self.env)]
+
+        self.env.interpret(self.parser.parse('s()(a=1)'))
+
+        a = (Identifier(Self()), Identifier(Name('a')).evaluate(self.env), Value(1))
+        for name in ['s', 't', 'u']:
+            found = self.env.lookup_template(Identifier(Name(name)).evaluate(self.env))
+            self.assertIn(a, found)
+            self.assertNotIn(Value(123), [o for (_, _, o) in found])
+
+        self.assertIs(table[Identifier(Name('w')).evaluate(self.env)], w)
+
+    def test_identical_redefinition_keeps_derived(self):
+        forms = self.parser.parse('s()(a=123) t()(s() b=456)')
+        self.env.interpret(forms)
+        uri = Identifier(Name('t')).evaluate(self.env)
+        triples = self.env._template_table[uri]
+
+        self.env.interpret(self.parser.parse('s()(a=123)'))
+
+        self.assertIs(self.env._template_table[uri], triples)
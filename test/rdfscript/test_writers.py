@@ -0,0 +1,144 @@
+import io
+import unittest
+
+import rdflib
+from lxml import etree
+from rdflib.compare import isomorphic
+
+from rdfscript.core import Uri, Value
+from rdfscript.rdf_data import RDFData, EncodedData
+from rdfscript.writers import TurtleWriter
+
+SBOL2 = 'http://sbols.org/v2#'
+SBOL3 = 'http://sbols.org/v3#'
+RDF = '{http://www.w3.org/1999/02/22-rdf-syntax-ns#}'
+
+TRIPLES = [(Uri('http://s.org/#a'), Uri('http://p.org/#p'), Value('quote " and\nline é')),
+           (Uri('http://s.org/#a'), Uri('http://s.org/#q'), Uri('http://s.org/#1b')),
+           (Uri('http://s.org/#a'), Uri('http://s.org/#q'), Value(2.5)),
+           (Uri('http://s.org/#b'), Uri('http://s.org/#q'), Value(3))]
+
+
+def filled(store, serializer, triples=TRIPLES, version=None):
+    data = store(serializer=serializer, version=version)
+    data.bind_prefix('s', Uri('http://s.org/#'))
+    for (s, p, o) in triples:
+        data.add(s, p, o)
+    return data
+
+
+def sbol_triples(sbol, triples):
+    rdf_type = Uri(str(rdflib.RDF.type))
+    return [(Uri(f'http://s.org/#{s}'),
+             rdf_type if p == 'a' else Uri(sbol + p),
+             Uri(sbol + o) if p == 'a' else Uri(f'http://s.org/#{o}'))
+            for (s, p, o) in triples]
+
+
+def nesting(xml):
+    """Each rdf:about in xml with that of the element it is nested in."""
+    nested = {}
+
+    def walk(element, owner):
+        about = element.get(RDF + 'about')
+        if about is not None:
+            nested[about[len('http://s.org/#'):]] = owner
+            owner = about[len('http://s.org/#'):]
+        for child in element:
+            walk(child, owner)
+    for element in etree.fromstring(xml.encode()):
+        walk(element, None)
+    return nested
+
+
+def written(data, sort=False):
+    out = io.StringIO()
+    data.write(out, sort=sort)
+    return out.getvalue()
+
+
+class WritersTest(unittest.TestCase):
+
+    def test_ntriples_lines_as_rdflib(self):
+        for store in (RDFData, EncodedData):
+            data = filled(store, 'nt')
+            self.assertCountEqual(written(data).splitlines(),
+                                  data.serialise().splitlines())
+
+    def test_ntriples_escaped_as_rdflib(self):
+        triples = TRIPLES + [(Uri('http://s.org/#é'), Uri('http://p.org/#p'), Value('\U0001D11E \\ \r')),
+                             (Uri('http://s.org/#a'), Uri('http://p.org/#p'),
+                              Value(rdflib.Literal('chat', lang='fr')))]
+        for store in (RDFData, EncodedData):
+            data = filled(store, 'nt', triples)
+            self.assertTrue(written(data).isascii())
+            self.assertCountEqual(written(data).splitlines(),
+                                  data.serialise().splitlines())
+
+    def test_ntriples_sorted(self):
+        lines = written(filled(RDFData, 'nt'), sort=True)
+        self.assertEqual(lines, written(filled(EncodedData, 'nt'), sort=True))
+        self.assertEqual(lines.splitlines()[:-1], sorted(lines.splitlines()[:-1]))
+
+    def test_turtle_same_graph(self):
+        for store in (RDFData, EncodedData):
+            for sort in (False, True):
+                data = filled(store, 'turtle')
+                graph = rdflib.Graph().parse(data=written(data, sort), format='turtle')
+                expected = rdflib.Graph().parse(data=data.serialise(), format='turtle')
+                self.assertTrue(isomorphic(graph, expected))
+
+    def test_turtle_prefixed_names(self):
+        out = io.StringIO()
+        writer = TurtleWriter(out, [('s', 'http://s.org/#'), ('not valid', 'http://n.org/#')],
+                              filled(RDFData, 'turtle').split_uri)
+        self.assertEqual(writer.term(rdflib.URIRef('http://s.org/#a')), 's:a')
+        self.assertEqual(writer.term(rdflib.URIRef('http://s.org/#1b')), '<http://s.org/#1b>')
+        self.assertEqual(writer.term(rdflib.URIRef('http://n.org/#a')), '<http://n.org/#a>')
+        self.assertNotIn('not valid', out.getvalue())
+
+    def test_sbol_xml_same_graph(self):
+        triples = sbol_triples(SBOL2, [('cd', 'a', 'ComponentDefinition'),
+                                       ('cd', 'sequenceAnnotation', 'sa')]) + TRIPLES
+        for store in (RDFData, EncodedData):
+            data = filled(store, 'sbolxml', triples)
+            graph = rdflib.Graph().parse(data=written(data), format='xml')
+            expected = filled(store, 'nt', triples).serialise()
+            self.assertTrue(isomorphic(graph, rdflib.Graph().parse(data=expected, format='nt')))
+            self.assertEqual(written(data), data.serialise())
+
+    def test_sbol2_children_nested(self):
+        triples = sbol_triples(SBOL2, [('cd', 'a', 'ComponentDefinition'),
+                                       ('cd', 'component', 'c'),
+                                       ('cd', 'sequenceAnnotation', 'sa'),
+                                       ('c', 'a', 'Component'),
+                                       ('sa', 'a', 'SequenceAnnotation'),
+                                       ('sa', 'component', 'c'),
+                                       ('sa', 'location', 'r'),
+                                       ('r', 'a', 'Range'),
+                                       ('other', 'a', 'ComponentDefinition'),
+                                       ('other', 'sequenceAnnotation', 'sa')])
+        for store in (RDFData, EncodedData):
+            xml = written(filled(store, 'sbolxml', triples, 'sbol_2'))
+            self.assertEqual(nesting(xml), {'cd': None, 'other': None, 'c': 'cd',
+                                            'sa': 'cd', 'r': 'sa'})
+            self.assertIn('<sbol:ComponentDefinition rdf:about="http://s.org/#cd">', xml)
+
+    def test_sbol3_children_nested(self):
+        triples = sbol_triples(SBOL3, [('c', 'a', 'Component'),
+                                       ('c', 'hasFeature', 'f'),
+                                       ('f', 'a', 'SubComponent'),
+                                       ('f', 'instanceOf', 'd'),
+                                       ('d', 'a', 'Component')])
+        xml = written(filled(RDFData, 'sbolxml', triples, 'sbol_3'))
+        self.assertEqual(nesting(xml), {'c': None, 'd': None, 'f': 'c'})
+        self.assertIn(f'xmlns:sbol="{SBOL3}"', xml)
+
+    def test_sbol_xml_cycle_written(self):
+        triples = sbol_triples(SBOL2, [('a', 'a', 'SequenceAnnotation'),
+                                       ('a', 'location', 'b'),
+                                       ('b', 'a', 'Range'),
+                                       ('b', 'location', 'a')])
+        # Range is written first, by type name
+        self.assertEqual(nesting(written(filled(RDFData, 'sbolxml', triples))),
+                         {'a': 'b', 'b': None})